@@ -0,0 +1,257 @@
+from inspect import iscoroutinefunction, signature
+from threading import Condition, Lock, Thread
+from time import monotonic, time
+from traceback import print_exception
+from typing import Any, Callable, NamedTuple
+import atexit
+
+from aspectpy.decorators import Advice
+
+
+class Batching(NamedTuple):
+    """
+    Options of `AfterReturningBatch`.
+
+    Parameters
+    ----------
+    size : int
+        The number of returned values in a full batch.
+
+    interval : float
+        The maximum number of seconds a returned value waits in a partial batch.
+
+    dtype : Any
+        NumPy data type of the returned values. If given, the values are collected
+        into a preallocated NumPy array, which is passed to the action, instead of
+        a list. Requires NumPy.
+
+    metadata : bool
+        Whether the batch contains a `ReturnRecord` with the function, the parameters
+        and the time of the call for every returned value, instead of the value only.
+    """
+
+    size: int = 1024
+    interval: float = 1.0
+    dtype: Any = None
+    metadata: bool = False
+
+
+class ReturnRecord(NamedTuple):
+    value: Any
+    target: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    time: float
+
+
+class AfterReturningBatch(Advice):
+    """
+    Decorator that collects the values returned by the decorated function into batches
+    and executes the action once per batch, when the batch is full or when its oldest
+    value is older than the interval. The actions are executed by a background thread,
+    so the returned value is returned to the caller unchanged and immediately.
+    The batches are also delivered by the `flush` method, and at interpreter exit.
+    Values returned after the interpreter started exiting are delivered right away
+    on the calling thread, since the background thread is stopped by then.
+
+    A single instance collects the values of all functions it decorates into the same
+    batches. Full batches wait for the background thread without a limit, so an action
+    that is slower than the decorated functions makes the waiting batches pile up.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    batching : Batching or None
+        The size and the interval of the batches and their contents.
+        If `None`, the defaults of `Batching` are used.
+
+    action : Callable
+        The action to be executed for every batch. This action must have a parameter
+        named `_RETURNED_BATCH_` at index 0, which receives a list or a NumPy array.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+
+    Raises
+    ------
+    ValueError
+        If the action does not have a parameter named `_RETURNED_BATCH_` at index 0,
+        or the options are invalid.
+    TypeError
+        If the action is a coroutine function.
+    ImportError
+        If a data type is given and NumPy is not installed.
+    """
+
+    _leading_action_args = 1
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        batching: Batching | None,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        batching = batching or Batching()
+        if batching.size < 1:
+            raise ValueError(f"size must be at least 1, got {batching.size}")
+        if batching.interval <= 0:
+            raise ValueError(f"interval must be positive, got {batching.interval}")
+        if batching.dtype is not None and batching.metadata:
+            raise ValueError("records with metadata cannot be collected into an array")
+        if iscoroutinefunction(action):
+            raise TypeError(
+                f"{action.__qualname__} is a coroutine function, but the actions "
+                + f"of {type(self).__name__} are called synchronously"
+            )
+        if list(signature(action).parameters)[:1] != ["_RETURNED_BATCH_"]:
+            raise ValueError(
+                f"{action.__qualname__} is missing '_RETURNED_BATCH_' argument at index 0."
+            )
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+
+        self.batching = batching
+        self.delivered = 0
+        self.failed = 0
+        self._empty: Callable[[], Any] = lambda: [None] * batching.size
+        if batching.dtype is not None:
+            try:
+                from numpy import empty
+            except ImportError as error:
+                raise ImportError(
+                    "collecting the batches into arrays requires NumPy"
+                ) from error
+            self._empty = lambda: empty(batching.size, batching.dtype)
+
+        self._buffer = self._empty()
+        self._count = 0
+        # The `time.monotonic` time the oldest value of the current batch was added at.
+        self._oldest = 0.0
+        self._pending: list[Any] = []
+        self._condition = Condition(Lock())
+        self._delivery = Lock()
+        self._thread: Thread | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of returned values that have not been delivered to the action yet.
+        """
+
+        with self._condition:
+            return self._count + sum(len(batch) for batch in self._pending)
+
+    def add(self, value: Any):
+        """
+        Adds a returned value to the current batch.
+        """
+
+        with self._condition:
+            count = self._count
+            if not count:
+                self._oldest = monotonic()
+            self._buffer[count] = value
+            count += 1
+            if count == self.batching.size:
+                self._pending.append(self._buffer)
+                self._buffer = self._empty()
+                count = 0
+                self._condition.notify()
+            self._count = count
+            closed = self._closed
+            if self._thread is None and not closed:
+                self._start()
+        if closed:
+            self.flush()
+
+    def flush(self):
+        """
+        Delivers the pending batches, including the current partial batch,
+        to the action on the calling thread.
+        """
+
+        with self._delivery:
+            self._deliver(self._take(partial=True))
+
+    def _take(self, partial: bool) -> list[Any]:
+        with self._condition:
+            if partial and self._count:
+                self._pending.append(self._buffer[: self._count])
+                self._buffer = self._empty()
+                self._count = 0
+            batches, self._pending = self._pending, []
+            return batches
+
+    def _deliver(self, batches: list[Any]):
+        for batch in batches:
+            try:
+                self.action(batch, *self.action_args, **self.action_kwargs)
+            except BaseException as exception:
+                self.failed += 1
+                print_exception(exception)
+            else:
+                self.delivered += 1
+
+    def _start(self):
+        self._thread = Thread(
+            target=self._work, name="aspectpy-batch", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self._close)
+
+    def _work(self):
+        condition = self._condition
+        interval = self.batching.interval
+        while True:
+            with condition:
+                # The interval of a partial batch counts from its oldest value, not from
+                # the last time the thread woke up, which may be much later after
+                # a slow delivery.
+                while not (self._pending or self._closed):
+                    timeout = interval
+                    if self._count:
+                        timeout = self._oldest + interval - monotonic()
+                        if timeout <= 0:
+                            break
+                    condition.wait(timeout)
+                if self._closed:
+                    return
+                partial = bool(self._count) and (
+                    monotonic() - self._oldest >= interval
+                )
+            with self._delivery:
+                self._deliver(self._take(partial))
+
+    def _close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _emit(self, name, body, namespace):
+        namespace[f"{name}_add"] = self.add
+        if not self.batching.metadata:
+            return body + [f"{name}_add(result)"]
+        namespace["ReturnRecord"] = ReturnRecord
+        namespace["time"] = time
+        return body + [
+            f"{name}_add(ReturnRecord(result, target, args, kwargs, time()))"
+        ]
+
+    def _is_async(self):
+        return False
@@ -0,0 +1,267 @@
+from collections import deque
+from inspect import iscoroutinefunction
+from threading import Lock
+from typing import Any, Callable, NamedTuple
+
+from aspectpy.decorators import Advice, _TargetStates, _indent
+
+# Compartments shared by the join points of named groups.
+_groups: dict[str, "Compartment"] = {}
+_groups_lock = Lock()
+
+
+class BulkheadLimits(NamedTuple):
+    """
+    Options of `Bulkhead`.
+
+    Parameters
+    ----------
+    limit : int
+        The maximum number of concurrent calls.
+
+    max_queue : int
+        The maximum number of calls waiting for a free slot. If 0, calls over the limit
+        are rejected immediately.
+
+    timeout : float or None
+        The maximum number of seconds a call waits in the queue before it is rejected.
+        If `None`, calls wait until a slot is free.
+
+    group : str or None
+        Name of a group of join points that share the limit, across all `Bulkhead`
+        instances. If `None`, every join point has a limit of its own.
+    """
+
+    limit: int
+    max_queue: int = 0
+    timeout: float | None = None
+    group: str | None = None
+
+
+def _grant(future: Any):
+    if not future.done():
+        future.set_result(None)
+
+
+class _Waiter:
+    __slots__ = ("granted", "lock", "future", "loop")
+
+    def __init__(self):
+        self.granted = False
+        self.lock: Any = None
+        self.future: Any = None
+        self.loop: Any = None
+
+
+class Compartment:
+    """
+    Concurrency limit shared by threads and coroutines. A call over the limit waits
+    in a bounded queue, and a slot freed by a finished call is handed over to the call
+    waiting the longest. Threads wait on a lock and coroutines on a future of their
+    event loop, so a waiting coroutine does not block its event loop.
+
+    Parameters
+    ----------
+    name : str
+        The name of the join point or of the group.
+
+    limits : BulkheadLimits
+        The limit, the size of the queue and the timeout.
+    """
+
+    def __init__(self, name: str, limits: BulkheadLimits):
+        self.name = name
+        self.limits = limits
+        self.in_flight = 0
+        self.rejected = 0
+        self.admitted = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = Lock()
+
+    @property
+    def queued(self) -> int:
+        """
+        The number of calls waiting for a free slot.
+        """
+
+        return len(self._waiters)
+
+    def _enter(self) -> _Waiter | bool:
+        # Takes a free slot, or queues a waiter, or rejects the call. Called locked.
+        if self.in_flight < self.limits.limit:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.limits.max_queue:
+            self.rejected += 1
+            return False
+        waiter = _Waiter()
+        self._waiters.append(waiter)
+        return waiter
+
+    def _give_up(self, waiter: _Waiter) -> bool:
+        # Removes a waiter that timed out, unless it got a slot in the meantime.
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self.rejected += 1
+            return False
+
+    def acquire(self) -> bool:
+        """
+        Takes a slot for a call of a thread. Returns `False` if the call is rejected.
+        """
+
+        with self._lock:
+            entered = self._enter()
+            if not isinstance(entered, _Waiter):
+                return entered
+            entered.lock = Lock()
+            entered.lock.acquire()
+        timeout = self.limits.timeout
+        if entered.lock.acquire(timeout=-1 if timeout is None else timeout):
+            return True
+        return self._give_up(entered)
+
+    async def acquire_async(self) -> bool:
+        """
+        Takes a slot for a call of a coroutine. Returns `False` if the call is rejected.
+        """
+
+        from asyncio import get_running_loop, wait
+
+        with self._lock:
+            entered = self._enter()
+            if not isinstance(entered, _Waiter):
+                return entered
+            entered.loop = get_running_loop()
+            entered.future = entered.loop.create_future()
+        try:
+            done, _ = await wait((entered.future,), timeout=self.limits.timeout)
+        except BaseException:
+            # A cancelled call passes on the slot it was given.
+            if self._give_up(entered):
+                self.release()
+            raise
+        return bool(done) or self._give_up(entered)
+
+    def release(self):
+        """
+        Frees the slot of a finished call, or hands it over to the first waiting call.
+        """
+
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+                if waiter.lock is not None:
+                    waiter.lock.release()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+                    return
+                except RuntimeError:
+                    # The event loop of the waiter is closed.
+                    continue
+            self.in_flight -= 1
+
+
+def _compartment(name: str, limits: BulkheadLimits) -> Compartment:
+    if limits.group is None:
+        return Compartment(name, limits)
+    with _groups_lock:
+        compartment = _groups.get(limits.group)
+        if compartment is None:
+            compartment = _groups[limits.group] = Compartment(limits.group, limits)
+        elif compartment.limits != limits:
+            raise ValueError(
+                f"the group {limits.group} is already limited by {compartment.limits}"
+            )
+        return compartment
+
+
+class Bulkhead(Advice):
+    """
+    Decorator that limits the number of concurrent calls of the decorated function,
+    including the advice inside of the `Bulkhead`. Calls over the limit wait in a bounded
+    queue, and when the queue is full or the wait times out, the action is executed
+    instead of the function, like the action of `Around`. Every decorated function
+    has its own `Compartment` with the limit, which is kept when more advice is applied
+    to the function, or shares the compartment of its group, available in `compartments`
+    by the qualified name of the function or the name of the group, with the `in_flight`,
+    `queued`, `admitted` and `rejected` counters.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    limits : BulkheadLimits
+        The limit, the size of the queue, the timeout and the group.
+
+    action : Callable
+        The fallback action executed when a call is rejected.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+
+    Raises
+    ------
+    ValueError
+        If the limit is less than 1 or the size of the queue is negative.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        limits: BulkheadLimits,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        if limits.limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limits.limit}")
+        if limits.max_queue < 0:
+            raise ValueError(f"max_queue must not be negative, got {limits.max_queue}")
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+        self._check_not_detached()
+        self.limits = limits
+        self.compartments: dict[str, Compartment] = {}
+        self._compartments = _TargetStates()
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        qualname = getattr(target, "__qualname__", repr(target))
+        compartment = self._compartments.get(
+            target, lambda: _compartment(qualname, self.limits)
+        )
+        self.compartments[compartment.name] = compartment
+
+        if iscoroutinefunction(target):
+            namespace[f"{name}_acquire"] = compartment.acquire_async
+            acquire = f"await {name}_acquire()"
+        else:
+            namespace[f"{name}_acquire"] = compartment.acquire
+            acquire = f"{name}_acquire()"
+        namespace[f"{name}_release"] = compartment.release
+        return (
+            [f"if {acquire}:", "    try:"]
+            + _indent(_indent(body))
+            + [
+                "    finally:",
+                f"        {name}_release()",
+                "else:",
+                f"    result = {self._action_call(name, namespace)}",
+            ]
+        )
@@ -0,0 +1,260 @@
+from collections import OrderedDict
+from inspect import Parameter, Signature, signature
+from sys import getsizeof
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, NamedTuple
+
+from aspectpy.decorators import Advice, _TargetStates
+
+MISSING = object()
+
+CacheKey = Callable[[tuple[Any, ...], dict[str, Any]], tuple[Any, ...]]
+
+
+def compile_cache_key(func_signature: Signature) -> CacheKey:
+    """
+    Compiles a function that builds a hashable key from the arguments and keyword
+    arguments of a call. Equivalent calls produce the same key regardless of whether
+    the parameters were passed positionally, by keyword or left to their defaults,
+    but the arguments are not bound with `inspect` on every call.
+
+    Parameters
+    ----------
+    func_signature : Signature
+        The signature of the function.
+
+    Returns
+    -------
+    Callable
+        Function that takes the arguments and keyword arguments of a call
+        and returns the key.
+    """
+
+    positional: list[tuple[str, Any]] = []
+    keyword: list[tuple[str, Any]] = []
+    has_var_positional = False
+    has_var_keyword = False
+
+    for name, param in func_signature.parameters.items():
+        if param.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD):
+            positional.append((name, param.default))
+        elif param.kind is Parameter.KEYWORD_ONLY:
+            keyword.append((name, param.default))
+        elif param.kind is Parameter.VAR_POSITIONAL:
+            has_var_positional = True
+        else:
+            has_var_keyword = True
+
+    positional_count = len(positional)
+    named = {name for name, _ in positional + keyword}
+
+    def key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, ...]:
+        values = list(args[:positional_count])
+        for name, default in positional[len(values) :]:
+            values.append(kwargs.get(name, default))
+        for name, default in keyword:
+            values.append(kwargs.get(name, default))
+        if has_var_positional:
+            values.append(args[positional_count:])
+        if has_var_keyword:
+            values.append(
+                tuple(sorted(item for item in kwargs.items() if item[0] not in named))
+            )
+        return tuple(values)
+
+    return key
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    bytes: int
+
+
+class Cache:
+    """
+    Thread-safe least recently used cache with optional expiration of entries.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        The maximum number of entries. If `None`, the number of entries is not limited.
+
+    max_bytes : int or None
+        The maximum total size of the cached values in bytes, as reported by
+        `sys.getsizeof`. If `None`, the size is not limited.
+
+    ttl : float or None
+        The number of seconds after which an entry expires. If `None`, entries do not expire.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 128,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+        self._entries: OrderedDict[Any, tuple[Any, float, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Any, default: Any = MISSING) -> Any:
+        """
+        Returns the cached value, or `default` if the key is missing or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, _ = entry
+                if expires >= monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Any, value: Any):
+        """
+        Caches a value and evicts the least recently used entries over the limits.
+        """
+
+        size = getsizeof(value) if self.max_bytes is not None else 0
+        expires = monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires, size)
+            self.bytes += size
+            while self._entries and (
+                (self.maxsize is not None and len(self._entries) > self.maxsize)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all entries. The statistics are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the statistics of the cache.
+        """
+
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, len(self._entries), self.bytes
+            )
+
+    def _remove(self, key: Any):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+
+class Cached(Advice):
+    """
+    Decorator that caches the returned values of the decorated function. The key of the
+    cache is built from the arguments of the call after the parameter updates are applied,
+    so calls that differ only in updated parameters share their entries. If the key is
+    found, the decorated function and the inner advice are not executed, similarly to
+    `Around` which does not proceed. Exceptions are not cached.
+
+    Every decorated function gets its own cache, which is kept when more advice is
+    applied to the function. The caches are available in `caches` by the qualified
+    names of the functions. All the arguments must be hashable.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    maxsize : int or None
+        The maximum number of entries per decorated function.
+        If `None`, the number of entries is not limited.
+
+    max_bytes : int or None
+        The maximum total size of the cached values per decorated function in bytes,
+        as reported by `sys.getsizeof`. If `None`, the size is not limited.
+
+    ttl : float or None
+        The number of seconds after which an entry expires. If `None`, entries do not expire.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        maxsize: int | None = 128,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ):
+        self.params_update = params_update
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.caches: dict[str, Cache] = {}
+        self._caches = _TargetStates()
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the statistics of the caches of all decorated functions combined.
+        """
+
+        infos = [cache.info() for cache in self._caches.values()]
+        if not infos:
+            return CacheInfo(0, 0, 0, 0, 0)
+        return CacheInfo(*map(sum, zip(*infos)))
+
+    def clear(self):
+        """
+        Removes all entries from the caches of all decorated functions.
+        """
+
+        for cache in self._caches.values():
+            cache.clear()
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        cache = self._caches.get(
+            target, lambda: Cache(self.maxsize, self.max_bytes, self.ttl)
+        )
+        self.caches[getattr(target, "__qualname__", repr(target))] = cache
+        namespace[f"{name}_key"] = compile_cache_key(signature(target))
+        namespace[f"{name}_get"] = cache.get
+        namespace[f"{name}_put"] = cache.put
+        namespace["MISSING"] = MISSING
+        return (
+            [
+                f"{name}_cache_key = {name}_key(args, kwargs)",
+                f"result = {name}_get({name}_cache_key)",
+                "if result is MISSING:",
+            ]
+            + ["    " + line for line in body]
+            + [f"    {name}_put({name}_cache_key, result)"]
+        )
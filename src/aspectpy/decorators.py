@@ -1,14 +1,55 @@
-from inspect import Signature, signature
-from typing import Any, Callable, Type
-from functools import wraps
+from __future__ import annotations
+
+import linecache
+from abc import ABC, abstractmethod
+from types import CodeType, FunctionType
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Type
+from functools import update_wrapper
+from itertools import count
+from weakref import WeakKeyDictionary, WeakSet, WeakValueDictionary
+
+from aspectpy.joinpoint import JOIN_POINT_PARAMETER, JoinPoint
+
+if TYPE_CHECKING:
+    from inspect import Signature
+
+# `inspect` and `asyncio` are imported when they are first needed,
+# so that importing this module stays cheap.
 
 FLAG_VALIDATED = "_AFTER_RETURNING_ACTION_VALIDATED_"
+FLAG_CONCURRENT = "_BEFORE_ACTION_CONCURRENT_"
+ACTION_DISPATCHER = "_ACTION_DISPATCHER_"
+ACTION_SAMPLER = "_ACTION_SAMPLER_"
+FLAG_STATIC_PROCEED = "_PROCEED_STATIC_"
+FLAG_DYNAMIC_PROCEED = "_PROCEED_DYNAMIC_"
+ADVICE_CHAIN = "__aspectpy_chain__"
+
+# Every wrapper compiled by the advice decorators, used by `aspectpy.registry`.
+WOVEN_FUNCTIONS: WeakSet[Callable[..., Any]] = WeakSet()
+
+ParamsRewrite = Callable[
+    [tuple[Any, ...], dict[str, Any]], tuple[tuple[Any, ...], dict[str, Any]]
+]
+
+
+def _iscoroutinefunction(func: Any) -> bool:
+    from inspect import iscoroutinefunction
+
+    return iscoroutinefunction(func)
+
+
+def _signature(func: Callable[..., Any]) -> Signature:
+    from inspect import signature
+
+    return signature(func)
 
 
 def validate_after_returning_action(func: Callable[..., Any]):
     """
     Decorator that checks if the action to be used in `AfterReturning`
     has the correct signature, i.e. has a parameter named `_RETURNED_VAL_`.
+    The signature is checked once, when the action is decorated, and the action
+    itself is returned, so calling it has no overhead.
 
     Parameters
     ----------
@@ -18,7 +59,7 @@ def validate_after_returning_action(func: Callable[..., Any]):
     Returns
     -------
     Callable
-        Wrapper function.
+        The same action.
 
     Raises
     ------
@@ -32,26 +73,109 @@ def validate_after_returning_action(func: Callable[..., Any]):
         raise ValueError(
             f"{func.__qualname__} is already decorated with @{validate_after_returning_action.__name__}"
         )
+
+    sig = _signature(func)
+    arg_name = "_RETURNED_VAL_"
+
+    if not sig.parameters:
+        raise ValueError(
+            f"{func.__qualname__} has no parameters. Missing '{arg_name}' argument at index 0."
+        )
+
+    if arg_name not in sig.parameters:
+        raise ValueError(
+            f"{func.__qualname__} is missing '{arg_name}' argument at index 0."
+        )
+
     setattr(func, FLAG_VALIDATED, True)
+    return func
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        sig = signature(func)
-        arg_name = "_RETURNED_VAL_"
 
-        if not sig.parameters:
-            raise ValueError(
-                f"{func.__qualname__} has no parameters. Missing '{arg_name}' argument at index 0."
-            )
+def concurrent_action(func: Callable[..., Any]):
+    """
+    Decorator that marks a coroutine action of `Before` as independent of the other
+    before actions of the same join point. Adjacent `Before` advice with such actions
+    run their actions concurrently with `asyncio.gather` when the decorated function
+    is a coroutine function.
 
-        if arg_name not in sig.parameters:
-            raise ValueError(
-                f"{func.__qualname__} is missing '{arg_name}' argument at index 0."
-            )
+    Parameters
+    ----------
+    func : Callable
+        The coroutine function to be used as the action of `Before`.
 
-        return func(*args, **kwargs)
+    Returns
+    -------
+    Callable
+        The same action.
+
+    Raises
+    ------
+    TypeError
+        If the action is not a coroutine function.
+    """
+
+    if not _iscoroutinefunction(func):
+        raise TypeError(f"{func.__qualname__} is not a coroutine function")
+    setattr(func, FLAG_CONCURRENT, True)
+    return func
 
-    return wrapper
+
+def static_proceed(func: Callable[..., Any]):
+    """
+    Decorator that declares a proceed condition of `Around` static, i.e. its result
+    depends only on the decorated function. A static proceed condition is evaluated
+    on the first call of each join point, and the decision is cached until it is
+    invalidated with `invalidate_proceed` or `reevaluate_proceed`.
+
+    Parameters
+    ----------
+    func : Callable
+        The proceed condition, which is called with the decorated function.
+
+    Returns
+    -------
+    Callable
+        The same proceed condition.
+
+    Raises
+    ------
+    ValueError
+        If the proceed condition is already declared dynamic.
+    """
+
+    if getattr(func, FLAG_DYNAMIC_PROCEED, False):
+        raise ValueError(f"{func.__qualname__} is already declared dynamic")
+    setattr(func, FLAG_STATIC_PROCEED, True)
+    return func
+
+
+def dynamic_proceed(func: Callable[..., Any]):
+    """
+    Decorator that declares a proceed condition of `Around` dependent on the arguments
+    of the call. A dynamic proceed condition is evaluated on every call and is called
+    with the decorated function, the arguments and the keyword arguments of the call
+    after the parameter updates are applied.
+
+    Parameters
+    ----------
+    func : Callable
+        The proceed condition.
+
+    Returns
+    -------
+    Callable
+        The same proceed condition.
+
+    Raises
+    ------
+    ValueError
+        If the proceed condition is already declared static.
+    """
+
+    if getattr(func, FLAG_STATIC_PROCEED, False):
+        raise ValueError(f"{func.__qualname__} is already declared static")
+    setattr(func, FLAG_DYNAMIC_PROCEED, True)
+    return func
 
 
 def mutate_params(
@@ -107,22 +231,504 @@ def mutate_params(
     return args, kwargs
 
 
-class Before:
+def compile_params_update(
+    func_signature: Signature,
+    params_update: dict[str, Any] | None,
+) -> ParamsRewrite | None:
     """
-    Decorator that executes an action before the decorated function is called.
+    Compiles `params_update` against a function signature into a rewrite plan that is
+    evaluated once, at decoration time. The returned callable replaces the updated
+    parameters in place, positionally if the caller passed them positionally and by
+    keyword otherwise, so no binding is needed on the call path. Unlike `mutate_params`,
+    the original positional/keyword layout of the call is preserved, which keeps
+    positional-only parameters and `*args`/`**kwargs` working.
+
+    Keys that do not name a regular parameter of the function, including the names of
+    `*args` and `**kwargs` parameters, are ignored, just like in `mutate_params`.
 
     Parameters
     ----------
+    func_signature : Signature
+        The signature of the function.
+
     params_update : dict or None
-        Dictionary with key to value mappings representing new parameters.
+        Dictionary with key to value mappings representing updates to parameters.
         If `None` or empty, the original parameters are used.
 
-        Can include both arguments and keyword arguments as
-        `new_params[arg_name] = value` and `new_params[kwarg_name] = value`
-        respectively.
+    Returns
+    -------
+    Callable or None
+        Function that takes the arguments and keyword arguments of a call and returns
+        them with the updates applied. The keyword arguments dictionary is updated in
+        place. `None` if there is nothing to update.
+    """
+
+    from inspect import Parameter
+
+    if not params_update:
+        return None
+
+    positional: list[tuple[int, str, Any]] = []
+    keyword: dict[str, Any] = {}
+    positional_only: list[Parameter] = []
+
+    for index, (name, param) in enumerate(func_signature.parameters.items()):
+        if param.kind is Parameter.POSITIONAL_ONLY:
+            positional_only.append(param)
+        if name not in params_update:
+            continue
+        if param.kind is Parameter.KEYWORD_ONLY:
+            keyword[name] = params_update[name]
+        elif param.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD):
+            positional.append((index, name, params_update[name]))
+
+    if not positional and not keyword:
+        return None
+    positional_only_count = len(positional_only)
+
+    def fill_positional_only(args: list[Any], index: int):
+        # Positional-only parameters cannot be passed by keyword, so the gap up
+        # to `index` has to be filled with their defaults.
+        for param in positional_only[len(args) : index]:
+            if param.default is Parameter.empty:
+                raise TypeError(f"missing a required argument: '{param.name}'")
+            args.append(param.default)
+
+    def rewrite(
+        args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> tuple[tuple[Any, ...], dict[str, Any]]:
+        if positional:
+            count = len(args)
+            new_args = None
+            for index, name, value in positional:
+                if index < count:
+                    if new_args is None:
+                        new_args = list(args)
+                    new_args[index] = value
+                elif index < positional_only_count:
+                    if new_args is None:
+                        new_args = list(args)
+                    fill_positional_only(new_args, index)
+                    new_args.append(value)
+                    count = len(new_args)
+                else:
+                    kwargs[name] = value
+            if new_args is not None:
+                args = tuple(new_args)
+        if keyword:
+            kwargs.update(keyword)
+        return args, kwargs
+
+    return rewrite
+
+
+# Compiled parameter updates by the shape of the signature and the updates,
+# shared by the join points with the same parameters.
+_REWRITES: WeakValueDictionary[Hashable, ParamsRewrite] = WeakValueDictionary()
+
+# Types whose equal values are interchangeable. Floats are not, e.g. `0.0 == -0.0`.
+_EXACT_TYPES = (type(None), bool, int, str, bytes)
+
+
+def _value_key(value: Any) -> Hashable:
+    # Values of the same exact type that compare equal are the same value, including
+    # tuples of them. Any other value is told apart by its identity, which is not
+    # reused while the rewrite that refers to it is alive.
+    if type(value) in _EXACT_TYPES:
+        return (type(value), value)
+    if type(value) is tuple:
+        return (tuple, tuple(_value_key(item) for item in value))
+    return (object, id(value))
+
+
+def _compile_for(
+    func: Callable[..., Any], params_update: dict[str, Any] | None
+) -> ParamsRewrite | None:
+    from inspect import Parameter
+
+    # The signature is only needed when there is something to rewrite.
+    if not params_update:
+        return None
+    func_signature = _signature(func)
+    # Only the defaults of positional-only parameters are used by the rewrite.
+    key = (
+        tuple(
+            (name, param.kind, _value_key(param.default))
+            if param.kind is Parameter.POSITIONAL_ONLY
+            else (name, param.kind)
+            for name, param in func_signature.parameters.items()
+        ),
+        tuple((key, _value_key(value)) for key, value in params_update.items()),
+    )
+    rewrite = _REWRITES.get(key)
+    if rewrite is None:
+        rewrite = compile_params_update(func_signature, params_update)
+        if rewrite is not None:
+            _REWRITES[key] = rewrite
+    return rewrite
+
+
+class AdviceChain:
+    """
+    Advice woven into a single join point. Stacked advice is fused into one chain,
+    which is compiled into a single wrapper function, so every call runs the whole
+    chain in one frame and the parameter updates of all advice are applied once.
+
+    Parameters
+    ----------
+    target : Callable
+        The original, unadvised function.
+
+    advice : tuple
+        The advice applied to the function, ordered from the outermost to the innermost.
+
+    code : CodeType
+        The code object of the compiled wrapper function. Used to tell the wrapper
+        apart from other decorators that copy its `__dict__` with `functools.wraps`.
+
+    proceed_decisions : tuple
+        The cached decisions of static proceed conditions of `Around` advice in the chain.
+    """
+
+    __slots__ = ("target", "advice", "code", "proceed_decisions")
+
+    def __init__(
+        self,
+        target: Callable[..., Any],
+        advice: tuple["Advice", ...],
+        code: CodeType,
+        proceed_decisions: tuple["ProceedDecision", ...] = (),
+    ):
+        self.target = target
+        self.advice = advice
+        self.code = code
+        self.proceed_decisions = proceed_decisions
+
+
+class ProceedDecision:
+    """
+    Cached decision of a static proceed condition of `Around` for a single join point.
+    The decision is `None` until the proceed condition is evaluated.
+
+    Parameters
+    ----------
+    proceed : Callable
+        The static proceed condition.
+
+    target : Callable
+        The decorated function, which is passed to the proceed condition.
+    """
+
+    __slots__ = ("proceed", "target", "decision")
+
+    def __init__(self, proceed: Callable[..., Any], target: Callable[..., Any]):
+        self.proceed = proceed
+        self.target = target
+        self.decision: bool | None = None
+
+
+def invalidate_proceed(func: Callable[..., Any]):
+    """
+    Invalidates the cached decisions of static proceed conditions of an advised function.
+    The proceed conditions are evaluated again on the next call.
+
+    Parameters
+    ----------
+    func : Callable
+        The advised function.
+
+    Raises
+    ------
+    ValueError
+        If the function is not advised.
+    """
+
+    chain = get_advice_chain(func)
+    if chain is None:
+        raise ValueError(f"{func.__qualname__} is not advised")
+    for item in chain.proceed_decisions:
+        item.decision = None
+
+
+def reevaluate_proceed(func: Callable[..., Any]):
+    """
+    Evaluates the static proceed conditions of an advised function again and caches
+    the new decisions. Coroutine proceed conditions cannot be awaited here, so their
+    decisions are only invalidated and get evaluated on the next call.
+
+    Parameters
+    ----------
+    func : Callable
+        The advised function.
+
+    Raises
+    ------
+    ValueError
+        If the function is not advised.
+    """
+
+    invalidate_proceed(func)
+    for item in get_advice_chain(func).proceed_decisions:
+        if not _iscoroutinefunction(item.proceed):
+            item.decision = item.proceed(item.target) is True
+
+
+def get_advice_chain(func: Callable[..., Any]) -> AdviceChain | None:
+    """
+    Returns the advice chain of a function woven by the advice decorators.
+
+    Parameters
+    ----------
+    func : Callable
+        The function to inspect.
+
+    Returns
+    -------
+    AdviceChain or None
+        The advice chain, or `None` if the function is not an advice wrapper.
+    """
+
+    chain = getattr(func, ADVICE_CHAIN, None)
+    if chain is None or chain.code is not getattr(func, "__code__", None):
+        return None
+    return chain
+
+
+def get_advice(func: Any) -> tuple["Advice", ...]:
+    """
+    Returns the advice woven into a function, ordered from the outermost
+    to the innermost. Bound methods, static methods and class methods are inspected
+    through their function.
+
+    Parameters
+    ----------
+    func : Any
+        The function to inspect.
+
+    Returns
+    -------
+    tuple
+        The advice, or an empty tuple if the function is not advised.
+    """
+
+    chain = get_advice_chain(getattr(func, "__func__", func))
+    return () if chain is None else chain.advice
+
+
+# Factories of the wrappers by their source, shared by the join points with the same
+# shape of advice chain.
+_COMPILED_CHAINS: dict[str, Callable[..., Callable[..., Any]]] = {}
+
+# Numbers of the file names the factories are compiled with.
+_CHAIN_NUMBERS = count()
+
+
+def _indent(lines: list[str]) -> list[str]:
+    return ["    " + line for line in lines]
+
+
+def _merged_params_update(advice: tuple["Advice", ...]) -> dict[str, Any]:
+    # Parameter updates of inner advice are applied after the outer ones,
+    # so they win when both update the same parameter.
+    params_update: dict[str, Any] = {}
+    for item in advice:
+        if item.params_update:
+            params_update.update(item.params_update)
+    return params_update
+
+
+def _compile_chain(
+    target: Callable[..., Any],
+    advice: tuple["Advice", ...],
+) -> Callable[..., Any]:
+    rewrite = _compile_for(target, _merged_params_update(advice))
+
+    is_async = _iscoroutinefunction(target)
+    for item in advice:
+        # The action may have been sampled after the advice was created.
+        item._check_sampling()
+    if not is_async:
+        for item in advice:
+            if item._is_async():
+                raise TypeError(
+                    f"{type(item).__name__} with coroutine callables cannot be applied "
+                    + f"to {target.__qualname__} which is not a coroutine function"
+                )
+
+    namespace: dict[str, Any] = {"target": target}
+    if rewrite is not None:
+        namespace["rewrite"] = rewrite
+    uses_join_point = any(item._join_point for item in advice)
+    if uses_join_point:
+        namespace["JoinPoint"] = JoinPoint
+        namespace["join_points"] = []
+    body = [f"result = {'await ' if is_async else ''}target(*args, **kwargs)"]
+    emitters = _group_concurrent(advice) if is_async else list(advice)
+    for index in reversed(range(len(emitters))):
+        body = emitters[index]._emit(f"advice_{index}", body, namespace)
+
+    if uses_join_point:
+        # Join points are taken from a pool, so that calls do not allocate them.
+        body = (
+            [
+                "join_point = join_points.pop() if join_points else JoinPoint()",
+                "join_point._begin(target, args, kwargs)",
+                "try:",
+            ]
+            + _indent(body)
+            + ["finally:", "    join_point._release(join_points)"]
+        )
+
+    lines = [f"{'async ' if is_async else ''}def wrapper(*args, **kwargs):"]
+    if rewrite is not None:
+        lines.append("    args, kwargs = rewrite(args, kwargs)")
+    lines += _indent(body)
+    lines.append("    return result")
+
+    wrapper = _instantiate("wrapper", lines, namespace)
+
+    update_wrapper(wrapper, target)
+    proceed_decisions = tuple(
+        value for value in namespace.values() if isinstance(value, ProceedDecision)
+    )
+    setattr(
+        wrapper,
+        ADVICE_CHAIN,
+        AdviceChain(target, advice, wrapper.__code__, proceed_decisions),
+    )
+    WOVEN_FUNCTIONS.add(wrapper)
+    return wrapper
+
+
+def _instantiate(
+    name: str, lines: list[str], namespace: dict[str, Any]
+) -> Callable[..., Any]:
+    """
+    Compiles the source lines defining the function with the name, with the objects
+    of the namespace as its free variables, and returns the function.
+    """
+
+    source = "\n".join(
+        [f"def make({', '.join(namespace)}):"]
+        + _indent(lines)
+        + [f"    return {name}"]
+    )
+    # Functions with the same source, e.g. the wrappers of join points with the same
+    # shape of advice chain, share the compiled factory, so every function only adds
+    # its function object and closure.
+    make = _COMPILED_CHAINS.get(source)
+    if make is None:
+        # Every source gets a file name of its own in `linecache`, so tracebacks
+        # and debuggers show the lines of the generated wrappers.
+        filename = f"<aspectpy chain {next(_CHAIN_NUMBERS)}>"
+        lines = source.splitlines(keepends=True)
+        linecache.cache[filename] = (len(source), None, lines, filename)
+        scope: dict[str, Any] = {}
+        exec(compile(source, filename, "exec"), scope)
+        make = _COMPILED_CHAINS[source] = scope["make"]
+    return make(**namespace)
+
+
+class _TargetStates:
+    """
+    States of stateful advice by the decorated function. The advice chain of a function
+    is compiled again whenever more advice is applied to it, so the advice looks its
+    state up here instead of creating it in `_emit`, and keeps it. Functions are
+    referenced weakly, unless they do not support weak references.
+    """
+
+    __slots__ = ("_weak", "_strong")
+
+    def __init__(self):
+        self._weak: WeakKeyDictionary[Any, Any] = WeakKeyDictionary()
+        self._strong: dict[Any, Any] = {}
+
+    def get(self, target: Callable[..., Any], create: Callable[[], Any]) -> Any:
+        """
+        Returns the state of the function, created by `create` if it has none.
+        """
+
+        states: Any = self._weak
+        try:
+            state = states.get(target)
+        except TypeError:
+            states = self._strong
+            state = states.get(target)
+        if state is None:
+            state = states[target] = create()
+        return state
+
+    def values(self) -> list[Any]:
+        """
+        Returns the states of all the functions.
+        """
+
+        return [*self._weak.values(), *self._strong.values()]
+
+    def items(self) -> list[tuple[Any, Any]]:
+        """
+        Returns the functions paired with their states.
+        """
+
+        return [*self._weak.items(), *self._strong.items()]
+
+    def named(self) -> dict[str, Any]:
+        """
+        Returns the states by the qualified names of the functions. Functions with
+        the same qualified name, e.g. closures, are told apart by their identity.
+        """
+
+        items = [
+            (getattr(target, "__qualname__", repr(target)), target, state)
+            for target, state in self.items()
+        ]
+        counts: dict[str, int] = {}
+        for name, _, _ in items:
+            counts[name] = counts.get(name, 0) + 1
+        return {
+            name if counts[name] == 1 else f"{name} at {id(target):#x}": state
+            for name, target, state in items
+        }
+
+
+def _group_concurrent(advice: tuple["Advice", ...]) -> list[Any]:
+    # Runs of adjacent `Before` advice with concurrent actions share one emitter.
+    emitters: list[Any] = []
+    for item in advice:
+        if (
+            isinstance(item, Before)
+            and getattr(item.action, FLAG_CONCURRENT, False)
+            and item._sampler() is None
+        ):
+            if emitters and isinstance(emitters[-1], _ConcurrentBefore):
+                emitters[-1].advice.append(item)
+                continue
+            item = _ConcurrentBefore(item)
+        emitters.append(item)
+    return [
+        item.advice[0] if isinstance(item, _ConcurrentBefore) and len(item.advice) == 1
+        else item
+        for item in emitters
+    ]
+
+
+class Advice(ABC):
+    """
+    Base class of the advice decorators. Applying advice to a function that is already
+    advised does not add another wrapper around it. The new advice is fused with the
+    existing advice chain as its outermost advice instead.
+
+    The action arguments are checked against the signature of the action when the
+    advice is created, and the action is called directly with them on every call.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
 
     action : Callable
-        The action to be executed before the decorated function is called.
+        The action of the advice.
 
     action_args : tuple
         The arguments to be passed to the action.
@@ -130,12 +736,29 @@ class Before:
     action_kwargs : dict
         The keyword arguments to be passed to the action.
 
-    Returns
-    -------
-    Callable
-        Wrapper function after instance of this class is called.
+    Raises
+    ------
+    ValueError
+        If the action arguments do not match the signature of the action, or if
+        the action is sampled, but the advice updates parameters or cannot be sampled.
     """
 
+    __slots__ = (
+        "params_update",
+        "action",
+        "action_args",
+        "action_kwargs",
+        "_action_join_point",
+        "__weakref__",
+    )
+
+    # The number of arguments the wrapper passes to the action before the stored ones.
+    _leading_action_args = 0
+
+    # Whether the action can be sampled, i.e. the advice keeps the outcome of the call
+    # when it is sampled, so sampling changes nothing but the side effects.
+    _samplable = False
+
     def __init__(
         self,
         params_update: dict[str, Any] | None,
@@ -147,20 +770,234 @@ class Before:
         self.action = action
         self.action_args = action_args
         self.action_kwargs = action_kwargs
+        self._check_action_arguments()
+        self._check_sampling()
 
     def __call__(self, func: Callable[..., Any]):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            args, kwargs = mutate_params(
-                args, kwargs, self.params_update, signature(func)
+        # Bound methods forward the chain of their function, but calling the target
+        # of the chain would not pass the instance, so they are wrapped as they are.
+        chain = get_advice_chain(func) if type(func) is FunctionType else None
+        if chain is None:
+            return _compile_chain(func, (self,))
+        # Weaving is idempotent, so the same advice instance is never applied twice.
+        if any(item is self for item in chain.advice):
+            return func
+        return _compile_chain(chain.target, (self, *chain.advice))
+
+    @property
+    def _join_point(self) -> bool:
+        """
+        Whether the action has a `_JOIN_POINT_` parameter.
+        """
+
+        return getattr(self, "_action_join_point", False)
+
+    def _action_call(
+        self, name: str, namespace: dict[str, Any], *leading: str
+    ) -> str:
+        """
+        Returns the source of the call of the action and adds the objects
+        it refers to into the namespace of the compiled wrapper.
+        """
+
+        namespace[name] = self.action
+        call_args = list(leading)
+
+        dispatcher = getattr(self.action, ACTION_DISPATCHER, None)
+        if dispatcher is not None:
+            if self._join_point:
+                raise ValueError(
+                    f"{self.action.__qualname__} is detached and cannot receive "
+                    + "the join point, which is reused after the call returns"
+                )
+            # Detached actions are queued with their bound arguments instead.
+            if self.action_args:
+                namespace[f"{name}_args"] = self.action_args
+                call_args.append(f"*{name}_args")
+            namespace[f"{name}_submit"] = dispatcher.submit
+            submitted_args = f"({', '.join(call_args)},)" if call_args else "()"
+            submitted_kwargs = "None"
+            if self.action_kwargs:
+                namespace[f"{name}_kwargs"] = self.action_kwargs
+                submitted_kwargs = f"{name}_kwargs"
+            return f"{name}_submit({name}, {submitted_args}, {submitted_kwargs})"
+
+        # The stored arguments are passed one by one, so the call does not
+        # need to unpack them.
+        for index, value in enumerate(self.action_args):
+            namespace[f"{name}_arg_{index}"] = value
+            call_args.append(f"{name}_arg_{index}")
+        if all(key.isidentifier() for key in self.action_kwargs):
+            for index, (key, value) in enumerate(self.action_kwargs.items()):
+                namespace[f"{name}_kwarg_{index}"] = value
+                call_args.append(f"{key}={name}_kwarg_{index}")
+        else:
+            namespace[f"{name}_kwargs"] = self.action_kwargs
+            call_args.append(f"**{name}_kwargs")
+        if self._join_point:
+            call_args.append(f"{JOIN_POINT_PARAMETER}=join_point")
+        await_ = "await " if _iscoroutinefunction(self.action) else ""
+        return f"{await_}{name}({', '.join(call_args)})"
+
+    def _check_action_arguments(self):
+        """
+        Checks that the stored arguments bind to the signature of the action.
+        Actions without an inspectable signature, like some builtins, are not checked.
+        Actions with a `_JOIN_POINT_` parameter are passed the join point of the call.
+        """
+
+        try:
+            sig = _signature(self.action)
+        except (TypeError, ValueError):
+            return
+        leading = (None,) * self._leading_action_args
+        join_point = {}
+        if JOIN_POINT_PARAMETER in sig.parameters:
+            self._action_join_point = True
+            join_point[JOIN_POINT_PARAMETER] = None
+        try:
+            sig.bind(*leading, *self.action_args, **self.action_kwargs, **join_point)
+        except TypeError as error:
+            raise ValueError(
+                f"{getattr(self.action, '__qualname__', self.action)} cannot be called "
+                + f"with the action arguments of {type(self).__name__}: {error}"
+            ) from error
+
+    def _is_async(self) -> bool:
+        """
+        Returns whether the advice has callables that have to be awaited.
+        """
+
+        return _iscoroutinefunction(self.action)
+
+    def _is_detached(self) -> bool:
+        """
+        Returns whether the action is executed by a `Dispatcher`.
+        """
+
+        return getattr(self.action, ACTION_DISPATCHER, None) is not None
+
+    def _sampler(self) -> Any:
+        """
+        Returns the `Sampler` of the action, or `None` if the action is not sampled.
+        """
+
+        return getattr(getattr(self, "action", None), ACTION_SAMPLER, None)
+
+    def _check_sampling(self):
+        """
+        Checks that a sampled action only has side effects, so that the sampled and
+        the skipped calls of the decorated function behave the same.
+        """
+
+        if self._sampler() is None:
+            return
+        action = getattr(self.action, "__qualname__", self.action)
+        if not self._samplable:
+            raise ValueError(
+                f"{action} is sampled, but {type(self).__name__} decides the outcome "
+                + "of the call with its action, which would differ on sampled calls"
+            )
+        if self.params_update:
+            raise ValueError(
+                f"{action} is sampled, but {type(self).__name__} updates parameters, "
+                + "which would differ on sampled calls"
             )
-            self.action(*self.action_args, **self.action_kwargs)
-            return func(*args, **kwargs)
 
-        return wrapper
+    def _emit_sampling(self, name: str, namespace: dict[str, Any]) -> list[str]:
+        """
+        Returns the source lines that decide whether the call is sampled into the
+        `{name}_sampled` variable.
+        """
+
+        namespace[f"{name}_sample"] = self._sampler()
+        return [f"{name}_sampled = {name}_sample()"]
+
+    def _check_not_detached(self):
+        if self._is_detached():
+            raise ValueError(
+                f"{self.action.__qualname__} is detached, but the result of the action "
+                + f"of {type(self).__name__} is needed"
+            )
 
+    @abstractmethod
+    def _emit(
+        self, name: str, body: list[str], namespace: dict[str, Any]
+    ) -> list[str]:
+        """
+        Returns the source lines of the advice around the source lines of the inner
+        advice chain. Both have to leave the return value in the `result` variable.
+        """
 
-class AfterReturning:
+
+class Before(Advice):
+    """
+    Decorator that executes an action before the decorated function is called.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+        Can include both arguments and keyword arguments as
+        `new_params[arg_name] = value` and `new_params[kwarg_name] = value`
+        respectively.
+
+    action : Callable
+        The action to be executed before the decorated function is called.
+        If the action is marked with `Dispatcher.detach`, it is queued to the worker
+        threads of the dispatcher instead.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    __slots__ = ()
+
+    _samplable = True
+
+    def _emit(self, name, body, namespace):
+        call = self._action_call(name, namespace)
+        if self._sampler() is None:
+            return [call] + body
+        return (
+            self._emit_sampling(name, namespace)
+            + [f"if {name}_sampled:", f"    {call}"]
+            + body
+        )
+
+
+class _ConcurrentBefore:
+    """
+    Emitter of adjacent `Before` advice whose actions are gathered concurrently.
+    """
+
+    __slots__ = ("advice",)
+
+    def __init__(self, advice: Before):
+        self.advice = [advice]
+
+    def _emit(self, name, body, namespace):
+        from asyncio import gather
+
+        namespace["gather"] = gather
+        calls = [
+            item._action_call(f"{name}_{index}", namespace).removeprefix("await ")
+            for index, item in enumerate(self.advice)
+        ]
+        return [f"await gather({', '.join(calls)})"] + body
+
+
+class AfterReturning(Advice):
     """
     Decorator that executes an action after the decorated function is called and returns.
 
@@ -177,7 +1014,9 @@ class AfterReturning:
     action : Callable
         The action to be executed after the decorated function is called and returns.
         This action must have a parameter named `_RETURNED_VAL_` and must be decorated with
-        `@validate_after_returning_action`.
+        `@validate_after_returning_action`. If the action is marked with `Dispatcher.detach`,
+        it is queued to the worker threads of the dispatcher and the returned value of the
+        decorated function is returned immediately.
 
     action_args : tuple
         The arguments to be passed to the action.
@@ -191,6 +1030,12 @@ class AfterReturning:
         Wrapper function after instance of this class is called.
     """
 
+    __slots__ = ()
+
+    _leading_action_args = 1
+
+    _samplable = True
+
     def __init__(
         self,
         params_update: dict[str, Any] | None,
@@ -203,24 +1048,27 @@ class AfterReturning:
                 f"{action.__qualname__} is not decorated "
                 + f"with @{validate_after_returning_action.__name__}",
             )
-        self.params_update = params_update
-        self.action = action
-        self.action_args = action_args
-        self.action_kwargs = action_kwargs
-
-    def __call__(self, func: Callable[..., Any]):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            args, kwargs = mutate_params(
-                args, kwargs, self.params_update, signature(func)
-            )
-            result = func(*args, **kwargs)
-            return self.action(result, *self.action_args, **self.action_kwargs)
-
-        return wrapper
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+
+    def _emit(self, name, body, namespace):
+        call = [self._action_call(name, namespace, "result")]
+        # The result of a sampled action is discarded, so that it does not replace
+        # the returned value only on the sampled calls.
+        if not self._is_detached() and self._sampler() is None:
+            call = [f"result = {call[0]}"]
+        if self._join_point:
+            call = ["join_point._returned(result)"] + call
+        if self._sampler() is None:
+            return body + call
+        return (
+            self._emit_sampling(name, namespace)
+            + body
+            + [f"if {name}_sampled:"]
+            + _indent(call)
+        )
 
 
-class AfterThrowing:
+class AfterThrowing(Advice):
     """
     Decorator that executes an action after the decorated function is called and throws an exception.
 
@@ -252,6 +1100,10 @@ class AfterThrowing:
         Wrapper function after instance of this class is called.
     """
 
+    __slots__ = ("exceptions",)
+
+    _samplable = True
+
     def __init__(
         self,
         params_update: dict[str, Any] | None,
@@ -260,27 +1112,34 @@ class AfterThrowing:
         *action_args,
         **action_kwargs,
     ):
-        self.params_update = params_update
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+        self._check_not_detached()
         self.exceptions = exceptions or Exception
-        self.action = action
-        self.action_args = action_args
-        self.action_kwargs = action_kwargs
 
-    def __call__(self, func: Callable[..., Any]):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            args, kwargs = mutate_params(
-                args, kwargs, self.params_update, signature(func)
-            )
-            try:
-                return func(*args, **kwargs)
-            except self.exceptions:
-                return self.action(*self.action_args, **self.action_kwargs)
-
-        return wrapper
+    def _emit(self, name, body, namespace):
+        namespace[f"{name}_exceptions"] = self.exceptions
+        call = self._action_call(name, namespace)
+        catch = f"except {name}_exceptions:"
+        handler = [] if self._sampler() is not None else [f"result = {call}"]
+        if self._join_point:
+            handler = [f"join_point._raised({name}_error)"] + handler
+            catch = f"except {name}_exceptions as {name}_error:"
+        sampling = []
+        if self._sampler() is not None:
+            # A sampled action is only told about the exception, which is raised
+            # again, so that it is not suppressed only on the sampled calls.
+            sampling = self._emit_sampling(name, namespace)
+            handler = [f"if {name}_sampled:"] + _indent(handler + [call]) + ["raise"]
+        return (
+            sampling
+            + ["try:"]
+            + _indent(body)
+            + [catch]
+            + _indent(handler)
+        )
 
 
-class Around:
+class Around(Advice):
     """
     Decorator that executes an action instead of the decorated function if the proceed condition is met.
     Else, the decorated function is called.
@@ -297,6 +1156,10 @@ class Around:
 
     proceed : bool or Callable
         The proceed condition. Can be a boolean or a callable that returns a boolean.
+        The callable is called with the decorated function on every call. If it is
+        decorated with `@static_proceed`, it is evaluated once per join point and the
+        decision is cached. If it is decorated with `@dynamic_proceed`, it is also
+        passed the arguments and keyword arguments of the call.
 
     action : Callable
         The action to be executed instead of the decorated function if the proceed condition is met.
@@ -313,6 +1176,8 @@ class Around:
         Wrapper function after instance of this class is called.
     """
 
+    __slots__ = ("proceed",)
+
     def __init__(
         self,
         params_update: dict[str, Any] | None,
@@ -321,23 +1186,41 @@ class Around:
         *action_args,
         **action_kwargs,
     ):
-        self.params_update = params_update
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+        self._check_not_detached()
         self.proceed = proceed
-        self.action = action
-        self.action_args = action_args
-        self.action_kwargs = action_kwargs
 
-    def __call__(self, func: Callable[..., Any]):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            proceed = self.proceed
-            if callable(proceed):
-                proceed = proceed(func)
-            if isinstance(proceed, bool) and proceed:
-                args, kwargs = mutate_params(
-                    args, kwargs, self.params_update, signature(func)
-                )
-                return func(*args, **kwargs)
-            return self.action(*self.action_args, **self.action_kwargs)
+    def _emit(self, name, body, namespace):
+        fallback = [f"result = {self._action_call(name, namespace)}"]
+        if not callable(self.proceed):
+            return body if self.proceed is True else fallback
+
+        setup: list[str] = []
+        namespace[f"{name}_proceed"] = self.proceed
+        await_ = "await " if _iscoroutinefunction(self.proceed) else ""
+        if getattr(self.proceed, FLAG_STATIC_PROCEED, False):
+            namespace[f"{name}_decision"] = ProceedDecision(
+                self.proceed, namespace["target"]
+            )
+            setup = [
+                f"decision = {name}_decision.decision",
+                "if decision is None:",
+                f"    decision = {name}_decision.decision = "
+                + f"({await_}{name}_proceed(target)) is True",
+            ]
+            condition = "decision"
+        elif getattr(self.proceed, FLAG_DYNAMIC_PROCEED, False):
+            condition = f"({await_}{name}_proceed(target, args, kwargs)) is True"
+        else:
+            condition = f"({await_}{name}_proceed(target)) is True"
+
+        return (
+            setup
+            + [f"if {condition}:"]
+            + _indent(body)
+            + ["else:"]
+            + _indent(fallback)
+        )
 
-        return wrapper
+    def _is_async(self):
+        return super()._is_async() or _iscoroutinefunction(self.proceed)
@@ -0,0 +1,236 @@
+from collections import deque
+from inspect import iscoroutinefunction
+from threading import Condition, Thread
+from traceback import print_exception
+from typing import Any, Callable, Literal
+import atexit
+
+from aspectpy.decorators import ACTION_DISPATCHER
+
+Policy = Literal["block", "drop", "drop_oldest"]
+POLICIES = ("block", "drop", "drop_oldest")
+
+
+class Dispatcher:
+    """
+    Bounded pool of worker threads that executes actions of `Before` and `AfterReturning`
+    off the caller's thread. Actions are marked for dispatching with the `detach` method.
+    The worker threads are started when the first action is submitted.
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker threads.
+
+    max_queue : int
+        The maximum number of actions waiting for a worker.
+
+    policy : str
+        What happens when an action is submitted and the queue is full.
+        `"block"` waits until there is room in the queue, `"drop"` drops the submitted
+        action and `"drop_oldest"` drops the oldest action in the queue.
+
+    error_handler : Callable or None
+        Called with the exception raised by an action. If `None`, the traceback
+        of the exception is printed to `sys.stderr`, as is the traceback of
+        an exception raised by the error handler itself.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue: int = 1024,
+        policy: Policy = "block",
+        error_handler: Callable[[BaseException], Any] | None = None,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if max_queue < 1:
+            raise ValueError(f"max_queue must be at least 1, got {max_queue}")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got '{policy}'")
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self.error_handler = error_handler
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+
+        self._queue: deque[tuple[Callable[..., Any], tuple, dict | None]] = deque()
+        self._condition = Condition()
+        self._threads: list[Thread] = []
+        self._running = 0
+        self._closed = False
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of actions waiting for a worker.
+        """
+
+        return len(self._queue)
+
+    def detach(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorator that marks an action of `Before` or `AfterReturning` to be executed
+        by this dispatcher. `AfterReturning` with a detached action returns the original
+        returned value immediately, since the result of the action is not awaited.
+
+        Parameters
+        ----------
+        func : Callable
+            The action.
+
+        Returns
+        -------
+        Callable
+            The same action.
+
+        Raises
+        ------
+        TypeError
+            If the action is a coroutine function.
+        """
+
+        if iscoroutinefunction(func):
+            raise TypeError(
+                f"{func.__qualname__} is a coroutine function and cannot be detached"
+            )
+        setattr(func, ACTION_DISPATCHER, self)
+        return func
+
+    def submit(
+        self,
+        action: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Queues an action to be executed by a worker thread.
+
+        Parameters
+        ----------
+        action : Callable
+            The action.
+
+        args : tuple
+            The arguments to be passed to the action.
+
+        kwargs : dict or None
+            The keyword arguments to be passed to the action.
+
+        Returns
+        -------
+        bool
+            `False` if the action was dropped, else `True`. Actions submitted after
+            the dispatcher is shut down, e.g. at interpreter exit, are dropped,
+            so the advised calls do not fail.
+        """
+
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if not self._threads:
+                self._start()
+            while len(self._queue) >= self.max_queue:
+                if self.policy == "drop":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                    break
+                self._condition.wait()
+                if self._closed:
+                    self.dropped += 1
+                    return False
+            self._queue.append((action, args, kwargs))
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Waits until all queued actions are executed.
+
+        Parameters
+        ----------
+        timeout : float or None
+            The maximum number of seconds to wait. If `None`, waits indefinitely.
+
+        Returns
+        -------
+        bool
+            `False` if the timeout expired before the queue was drained, else `True`.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._running, timeout
+            )
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops accepting actions, so the actions submitted later are dropped.
+        The worker threads exit after the queue is drained.
+
+        Parameters
+        ----------
+        wait : bool
+            Whether to wait for the worker threads to exit.
+        """
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _start(self):
+        for index in range(self.workers):
+            thread = Thread(
+                target=self._work, name=f"aspectpy-dispatcher-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.shutdown)
+
+    def _work(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._queue:
+                    if self._closed:
+                        return
+                    condition.wait()
+                action, args, kwargs = self._queue.popleft()
+                self._running += 1
+                condition.notify_all()
+
+            failed = False
+            try:
+                action(*args, **(kwargs or {}))
+            except BaseException as exception:
+                failed = True
+                self._handle(exception)
+            finally:
+                with condition:
+                    self._running -= 1
+                    if failed:
+                        self.failed += 1
+                    else:
+                        self.processed += 1
+                    condition.notify_all()
+
+    def _handle(self, exception: BaseException):
+        # The worker keeps running if the error handler fails too.
+        try:
+            if self.error_handler is None:
+                print_exception(exception)
+            else:
+                self.error_handler(exception)
+        except BaseException as error:
+            print_exception(error)
@@ -0,0 +1,119 @@
+from time import perf_counter_ns
+from typing import Any, Callable
+
+# Name of the action parameter that receives the join point.
+JOIN_POINT_PARAMETER = "_JOIN_POINT_"
+
+
+class JoinPoint:
+    """
+    Context of a call of an advised function, passed to the actions that have
+    a parameter named `_JOIN_POINT_`. The bound arguments are only computed
+    when they are accessed.
+
+    Join points are reused by later calls of the same advised function, so a join
+    point is only valid until the call it was passed for returns. Actions that keep
+    the join point for later have to keep a `copy` of it instead.
+
+    Attributes
+    ----------
+    target : Callable
+        The original, unadvised function.
+
+    args : tuple
+        The arguments of the call, after the parameter updates.
+
+    kwargs : dict
+        The keyword arguments of the call, after the parameter updates.
+
+    result : Any
+        The value returned by the function, or `None` if it has not returned.
+
+    exception : BaseException or None
+        The exception raised by the function, or `None` if it has not raised.
+
+    start : int
+        The `time.perf_counter_ns` time of the start of the call.
+
+    end : int or None
+        The `time.perf_counter_ns` time at which the function returned or raised,
+        or `None` if it has not finished.
+    """
+
+    __slots__ = (
+        "target",
+        "args",
+        "kwargs",
+        "result",
+        "exception",
+        "start",
+        "end",
+        "_arguments",
+    )
+
+    def __init__(self):
+        self._release(None)
+
+    @property
+    def arguments(self) -> dict[str, Any]:
+        """
+        The arguments of the call bound to the parameters of the target by name,
+        including the default values of the parameters that were not passed.
+        """
+
+        if self._arguments is None:
+            from inspect import signature
+
+            bound = signature(self.target).bind(*self.args, **self.kwargs)
+            bound.apply_defaults()
+            self._arguments = bound.arguments
+        return self._arguments
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The number of seconds from the start of the call until the function finished,
+        or until now if it has not finished.
+        """
+
+        end = perf_counter_ns() if self.end is None else self.end
+        return (end - self.start) / 1e9
+
+    def copy(self) -> "JoinPoint":
+        """
+        Returns a copy of the join point that is not reused by later calls.
+        """
+
+        copy = JoinPoint()
+        for name in JoinPoint.__slots__:
+            setattr(copy, name, getattr(self, name))
+        return copy
+
+    def _begin(
+        self, target: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ):
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.start = perf_counter_ns()
+
+    def _returned(self, result: Any):
+        self.result = result
+        self.end = perf_counter_ns()
+
+    def _raised(self, exception: BaseException):
+        self.exception = exception
+        self.end = perf_counter_ns()
+
+    def _release(self, pool: list["JoinPoint"] | None):
+        # Drops the references to the call, so that they are not kept alive by the pool.
+        self.target = None
+        self.args = ()
+        self.kwargs = {}
+        self.result = None
+        self.exception = None
+        self.start = 0
+        self.end = None
+        self._arguments = None
+        if pool is not None:
+            pool.append(self)
@@ -0,0 +1,107 @@
+from functools import update_wrapper
+from typing import Any, Callable
+from weakref import WeakSet
+
+from aspectpy.decorators import Advice
+
+# Placeholders whose advice has not been woven yet, used by `aspectpy.registry`.
+PENDING_JOIN_POINTS: WeakSet["LazyJoinPoint"] = WeakSet()
+
+
+class LazyJoinPoint:
+    """
+    Placeholder of a function whose advice is woven when the function is first accessed
+    as a class attribute or first called. The placeholder then replaces itself with the
+    woven function in the class, or in the module globals of a module-level function,
+    so the startup cost of weaving is paid only for functions that are actually used.
+
+    Parameters
+    ----------
+    target : Callable
+        The function to be advised.
+
+    advice : tuple
+        The advice to be applied, in order of application, i.e. the last one is the outermost.
+    """
+
+    def __init__(self, target: Callable[..., Any], advice: tuple[Advice, ...]):
+        self.target = target
+        self.advice = advice
+        self._woven: Callable[..., Any] | None = None
+        self._owner: type | None = None
+        self._name = getattr(target, "__name__", None)
+        update_wrapper(self, target)
+        PENDING_JOIN_POINTS.add(self)
+
+    @property
+    def name(self) -> str | None:
+        """
+        The name of the attribute the placeholder is stored in.
+        """
+
+        return self._name
+
+    def weave(self) -> Callable[..., Any]:
+        """
+        Returns the woven function, weaving it if it has not been woven yet.
+        """
+
+        woven = self._woven
+        if woven is None:
+            woven = self.target
+            for advice in self.advice:
+                woven = advice(woven)
+            self._woven = woven
+            PENDING_JOIN_POINTS.discard(self)
+        return woven
+
+    def install(self) -> Callable[..., Any]:
+        """
+        Weaves the function and replaces the placeholder with the woven function
+        in its class, or in the module globals of a module-level function.
+        """
+
+        woven = self.weave()
+        if self._owner is not None:
+            if vars(self._owner).get(self._name) is self:
+                setattr(self._owner, self._name, woven)
+        else:
+            module_globals = getattr(self.target, "__globals__", None)
+            if module_globals is not None and module_globals.get(self._name) is self:
+                module_globals[self._name] = woven
+        return woven
+
+    def __set_name__(self, owner: type, name: str):
+        self._owner = owner
+        self._name = name
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        woven = self.install()
+        if instance is None:
+            return woven
+        return woven.__get__(instance, owner)
+
+    def __call__(self, *args, **kwargs):
+        return self.install()(*args, **kwargs)
+
+
+def lazy(*advice: Advice) -> Callable[[Callable[..., Any]], LazyJoinPoint]:
+    """
+    Decorator that weaves the advice into the decorated function lazily, when the function
+    is first accessed as a class attribute or first called.
+
+    Parameters
+    ----------
+    advice : tuple
+        The advice to be applied, in order of application, i.e. the last one is the outermost.
+
+    Returns
+    -------
+    Callable
+        Decorator returning a `LazyJoinPoint`.
+    """
+
+    def decorator(func: Callable[..., Any]) -> LazyJoinPoint:
+        return LazyJoinPoint(func, advice)
+
+    return decorator
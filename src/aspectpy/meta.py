@@ -4,9 +4,10 @@ from aspectpy.decorators import (
     AfterReturning,
     AfterThrowing,
     Around,
+    static_proceed,
     validate_after_returning_action,
 )
-from inspect import signature
+from aspectpy.pointcut import Pointcuts
 import re
 
 
@@ -17,50 +18,52 @@ class Aspect(type):
     around_regexp = re.compile(r"^test[_]?7$")
     after_throwing_regexp = re.compile(r"^test([8,9]|10)$")
 
-    def __new__(cls, name, bases, namespace):
-        for attr_name, attr_value in namespace.items():
-            stored_value = attr_value
-            if not callable(attr_value) or attr_name == "__init__":
-                continue
+    # Whether the advice is skipped in calls through `super()` of an advised method
+    skip_super = False
 
-            if cls.before_regexp.match(attr_name):
-                # Explicitly calling the decorator instance
-                namespace[attr_name] = Before(None, cls.action, "before", 1, 2)(
-                    stored_value
-                )
-                stored_value = namespace[attr_name]
+    def __new__(cls, name, bases, namespace):
+        # The pointcuts are compiled once per metaclass and reused for every class
+        pointcuts = vars(cls).get("compiled_pointcuts")
+        if pointcuts is None:
+            pointcuts = cls.compile_pointcuts()
+            cls.compiled_pointcuts = pointcuts
+        pointcuts.weave_namespace(namespace)
+        return super().__new__(cls, name, bases, namespace)
 
-            if cls.after_returning_regexp.match(attr_name):
-                # Explicitly calling the decorator instance
-                namespace[attr_name] = AfterReturning(
+    @classmethod
+    def compile_pointcuts(cls) -> Pointcuts:
+        return (
+            Pointcuts(skip_super=cls.skip_super)
+            .add(cls.before_regexp, Before(None, cls.action, "before", 1, 2))
+            .add(
+                cls.after_returning_regexp,
+                AfterReturning(
                     None, cls.action_after_returning, "after returning", 2, 3
-                )(stored_value)
-                stored_value = namespace[attr_name]
-
-            if cls.after_throwing_regexp.match(attr_name):
-                # Explicitly calling the decorator instance
-                namespace[attr_name] = AfterThrowing(
+                ),
+            )
+            .add(
+                cls.after_throwing_regexp,
+                AfterThrowing(
                     None,
                     (ConnectionError, ValueError),
                     cls.action,
                     "after throwing",
                     3,
                     4,
-                )(stored_value)
-                stored_value = namespace[attr_name]
-
-            if cls.around_regexp.match(attr_name):
-                # Explicitly calling the decorator instance
-                namespace[attr_name] = Around(
+                ),
+            )
+            .add(
+                cls.around_regexp,
+                Around(
                     {"number": 122, "y": None},
                     cls.proceed,
                     cls.action,
                     "around",
                     4,
                     5,
-                )(stored_value)
-                stored_value = namespace[attr_name]
-        return super().__new__(cls, name, bases, namespace)
+                ),
+            )
+        )
 
     @staticmethod
     def action(arg1: Any, arg2: Any, arg3: Any) -> float:
@@ -77,7 +80,10 @@ class Aspect(type):
         return _RETURNED_VAL_ * 2
 
     @staticmethod
+    @static_proceed
     def proceed(func: Callable[..., Any]) -> bool:
+        from inspect import signature
+
         sig = signature(func)
         params = sig.parameters.keys()
         return_type = sig.return_annotation
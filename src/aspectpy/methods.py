@@ -0,0 +1,193 @@
+from contextvars import ContextVar
+from functools import cached_property
+from threading import get_ident
+from typing import Any, Callable, Iterable
+
+from aspectpy.decorators import Advice, _indent, _iscoroutinefunction
+
+
+class _SuperCalls(list):
+    """
+    Stack of the instances or classes, the names and the functions of the methods
+    executed by guarded methods calling `super()`, innermost last, owned by a thread.
+    The bottom entry matches no call, so the stack is never empty.
+    """
+
+    __slots__ = ("thread",)
+
+    def __init__(self, thread: int | None):
+        super().__init__([(None, None, None)])
+        self.thread = thread
+
+
+def _new_super_calls() -> _SuperCalls:
+    # Stacks are updated only by the thread that owns them, so a context copied into
+    # another thread, e.g. by `asyncio.to_thread`, gets a stack of its own there.
+    stack = _SuperCalls(get_ident())
+    _super_calls.set(stack)
+    return stack
+
+
+# Functions keep the stack in a context variable that is set once per thread,
+# so reading it is cheap, and update the stack in place. Calls in other threads that
+# run a copy of the context, e.g. the workers of `Timeout`, see the stack of the thread
+# that copied it, since they are part of its call. Coroutines interleave in a thread,
+# so they set another context variable to the innermost call instead. Only methods
+# calling `super()` update them.
+_super_calls: ContextVar[_SuperCalls] = ContextVar(
+    "aspectpy_super_calls", default=_SuperCalls(None)
+)
+_super_coroutine: ContextVar[tuple[Any, Any, Any]] = ContextVar(
+    "aspectpy_super_coroutine", default=(None, None, None)
+)
+
+
+def method_function(method: Any) -> Callable[..., Any] | None:
+    """
+    Returns the function of a method as stored in a class namespace, i.e. of a plain
+    function, `staticmethod` or `classmethod`, or `None` for other descriptors,
+    like properties, which consist of several functions.
+    """
+
+    if isinstance(method, (staticmethod, classmethod)):
+        return method.__func__
+    if isinstance(method, (property, cached_property)):
+        return None
+    return method
+
+
+def replace_function(method: Any, func: Callable[..., Any]) -> Any:
+    """
+    Returns a method of the same kind as `method` with the function replaced by `func`.
+    """
+
+    if isinstance(method, staticmethod):
+        return staticmethod(func)
+    if isinstance(method, classmethod):
+        return classmethod(func)
+    return func
+
+
+def is_method(attr_value: Any) -> bool:
+    """
+    Returns whether a class attribute can be advised by `advise_method`.
+    """
+
+    return callable(attr_value) or isinstance(
+        attr_value, (staticmethod, classmethod, property, cached_property)
+    )
+
+
+def advise_method(method: Any, advice: Iterable[Advice]) -> Any:
+    """
+    Applies advice to a method as stored in a class namespace. The functions of
+    static methods, class methods, properties and cached properties are advised
+    and wrapped in a descriptor of the same kind again, so they keep being bound
+    the same way. Any other callable is advised as a function.
+
+    Parameters
+    ----------
+    method : Any
+        The method.
+
+    advice : Iterable
+        The advice to be applied, in order of application, i.e. the last one is the outermost.
+
+    Returns
+    -------
+    Any
+        The advised method.
+    """
+
+    advice = tuple(advice)
+
+    def weave(func: Callable[..., Any] | None) -> Callable[..., Any] | None:
+        if func is None:
+            return None
+        for item in advice:
+            func = item(func)
+        return func
+
+    if isinstance(method, property):
+        return type(method)(
+            weave(method.fget), weave(method.fset), weave(method.fdel), method.__doc__
+        )
+    if isinstance(method, cached_property):
+        advised = cached_property(weave(method.func))
+        if method.attrname is not None:
+            advised.__set_name__(None, method.attrname)
+        return advised
+
+    return replace_function(method, weave(method_function(method)))
+
+
+class SuperCallGuard(Advice):
+    """
+    Decorator that skips the advice inside of it when the decorated method is called
+    through `super()` by an overriding method with the same name for the same instance
+    or class. Only the original method is executed then, so the advice woven into every
+    class of a hierarchy runs once per top-level call. Any other call is advised,
+    including recursive calls and calls made through another method, e.g. `f` calling
+    `g` calling `f` advises all three calls. The parameter updates are applied to
+    every call.
+
+    Only methods that call `super()` without arguments record that they are executed,
+    so the guard of any other method costs a single read of a context variable.
+    Overridden methods called explicitly, e.g. by `Base.f(self)`, are advised.
+
+    The guard has to be the outermost advice of the method, and it cannot be applied
+    to static methods, which are not called on an instance or class.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(self):
+        self.params_update = None
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        namespace[f"{name}_method"] = target.__name__
+        is_async = _iscoroutinefunction(target)
+        if is_async:
+            namespace["super_coroutine"] = _super_coroutine
+            caller = [f"{name}_caller = super_coroutine.get()"]
+        else:
+            namespace["super_calls"] = _super_calls.get
+            caller = [
+                f"{name}_stack = super_calls()",
+                f"{name}_caller = {name}_stack[-1]",
+            ]
+        lines = caller + [
+            f"if {name}_caller[0] is args[0] and {name}_caller[1] == {name}_method"
+            + f" and {name}_caller[2] is not target:",
+            f"    result = {'await ' if is_async else ''}target(*args, **kwargs)",
+            "else:",
+        ]
+
+        # Functions calling `super()` without arguments have a `__class__` cell.
+        code = getattr(target, "__code__", None)
+        if code is None or "__class__" not in code.co_freevars:
+            return lines + _indent(body)
+        call = f"(args[0], {name}_method, target)"
+        if is_async:
+            enter = [f"{name}_token = super_coroutine.set({call})"]
+            leave = f"super_coroutine.reset({name}_token)"
+        else:
+            namespace["get_ident"] = get_ident
+            namespace["new_super_calls"] = _new_super_calls
+            enter = [
+                f"if {name}_stack.thread != get_ident():",
+                f"    {name}_stack = new_super_calls()",
+                f"{name}_stack.append({call})",
+            ]
+            leave = f"{name}_stack.pop()"
+        return (
+            lines
+            + _indent(enter + ["try:"] + _indent(body) + ["finally:", f"    {leave}"])
+        )
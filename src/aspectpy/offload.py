@@ -0,0 +1,390 @@
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import Context, copy_context
+from functools import partial
+from importlib import import_module
+from inspect import iscoroutinefunction
+from os import cpu_count
+from threading import Lock, local
+from typing import Any, Callable, Iterable, Iterator
+
+from aspectpy.decorators import (
+    Advice,
+    _TargetStates,
+    _compile_chain,
+    _compile_for,
+    _indent,
+    _instantiate,
+    _merged_params_update,
+    get_advice_chain,
+)
+
+_worker = local()
+_default_pool: "OffloadPool | None" = None
+_default_pool_lock = Lock()
+
+# Functions executed by the workers by the module and the qualified name
+# of the advised function.
+_resolved: dict[tuple[str, str], Callable[..., Any]] = {}
+
+
+def _in_worker() -> bool:
+    return getattr(_worker, "active", False)
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def _ready():
+    pass
+
+
+def _resolve(key: tuple[str, str]) -> Callable[..., Any]:
+    # Finds the advised function by importing its module, and compiles the target
+    # with the advice inside of its outermost `Offload`.
+    func = _resolved.get(key)
+    if func is not None:
+        return func
+    module, qualname = key
+    found: Any = import_module(module)
+    for part in qualname.split("."):
+        found = getattr(found, part, None)
+    if found is None:
+        # E.g. a worker process forked while the module was being imported, by a pool
+        # warmed up at the module level, has a copy of the partially executed module,
+        # which is not executed again.
+        raise RuntimeError(
+            f"{module}.{qualname} cannot be offloaded, since it cannot be imported "
+            + "by the worker, e.g. because the pool was warmed up before it was defined"
+        )
+    chain = get_advice_chain(getattr(found, "__func__", found))
+    if chain is None:
+        raise RuntimeError(f"{module}.{qualname} is not advised")
+    position = next(
+        index for index, item in enumerate(chain.advice) if isinstance(item, Offload)
+    )
+    inner = chain.advice[position + 1 :]
+    func = _compile_chain(chain.target, inner) if inner else chain.target
+    _resolved[key] = func
+    return func
+
+
+def _call(key: tuple[str, str], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    return _resolve(key)(*args, **kwargs)
+
+
+def _call_packed(
+    key: tuple[str, str], arguments: tuple[tuple[Any, ...], dict[str, Any]]
+) -> Any:
+    return _resolve(key)(*arguments[0], **arguments[1])
+
+
+def _run_packed(
+    inner: Callable[..., Any],
+    context: Context,
+    arguments: tuple[tuple[Any, ...], dict[str, Any]],
+) -> Any:
+    return context.run(inner, *arguments)
+
+
+class OffloadPool:
+    """
+    Managed pool of worker processes or threads that executes functions decorated with
+    `Offload`. The workers are started as the calls are submitted, or all at once
+    by `warm_up`. Worker processes import the module of an offloaded function when they
+    first execute it, so the function has to be importable by its qualified name,
+    and its arguments, results and exceptions have to be picklable.
+
+    Parameters
+    ----------
+    workers : int or None
+        The number of workers. If `None`, the number of CPUs is used.
+
+    processes : bool
+        Whether the workers are processes. Threads only run in parallel when the
+        functions release the GIL, e.g. in I/O or in extension modules.
+
+    mp_context : Any
+        The multiprocessing context the worker processes are started with.
+        If `None`, the default context is used.
+
+    Raises
+    ------
+    ValueError
+        If the number of workers is less than 1.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        processes: bool = True,
+        mp_context: Any = None,
+    ):
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers or cpu_count() or 1
+        self.processes = processes
+        self.mp_context = mp_context
+        self._executor: Executor | None = None
+        self._lock = Lock()
+
+    @property
+    def executor(self) -> Executor:
+        """
+        The executor of the pool, created when it is first accessed.
+        """
+
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(
+                        self.workers,
+                        mp_context=self.mp_context,
+                        initializer=_mark_worker,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers,
+                        thread_name_prefix="aspectpy-offload",
+                        initializer=_mark_worker,
+                    )
+            return self._executor
+
+    def warm_up(self):
+        """
+        Starts all the workers and waits until they are ready, so the first calls
+        do not wait for them. Worker processes started by forking do not have
+        the functions defined after the pool is warmed up, e.g. in the rest of a module
+        that warms the pool up when it is imported, so the pool should be warmed up
+        after the offloaded functions are defined. Pools are not warmed up in the workers.
+        """
+
+        if _in_worker():
+            return
+        executor = self.executor
+        wait([executor.submit(_ready) for _ in range(self.workers)])
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts the workers down. The pool is started again by the next call.
+
+        Parameters
+        ----------
+        wait : bool
+            Whether to wait until the submitted calls finish.
+        """
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait)
+
+
+def default_pool() -> OffloadPool:
+    """
+    Returns the pool of worker processes shared by `Offload` advice without a pool
+    of its own.
+    """
+
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = OffloadPool()
+        return _default_pool
+
+
+def _completed(inner: Callable[..., Any], args: tuple, kwargs: dict) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(inner(args, kwargs))
+    except BaseException as error:
+        future.set_exception(error)
+    return future
+
+
+class Offload(Advice):
+    """
+    Decorator that executes the decorated function, including the advice inside
+    of the `Offload`, in an `OffloadPool` instead of the calling thread. The advice
+    outside of the `Offload` and the parameter updates are applied in the calling
+    thread, so the function receives the updated arguments. Exceptions raised by
+    the function are raised in the calling thread again, so they can be handled by
+    an outer `AfterThrowing`.
+
+    Worker processes execute the function as found by importing its module, with
+    the advice inside of the outermost `Offload` compiled again in every process.
+    A decorated function called by a worker is executed directly, so nested calls
+    do not wait for the pool they are executed by. Coroutine functions cannot be
+    offloaded.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    pool : OffloadPool or None
+        The pool the calls are executed by. If `None`, the pool of worker processes
+        returned by `default_pool` is used.
+
+    wait : bool
+        Whether the decorated function waits for the call and returns its result,
+        or returns a `concurrent.futures.Future` of the result immediately.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None = None,
+        pool: OffloadPool | None = None,
+        wait: bool = True,
+    ):
+        self.params_update = params_update
+        self.pool = pool or default_pool()
+        self.wait = wait
+        # The inner advice chain of every decorated function, run by `map`.
+        self._inner_chains = _TargetStates()
+
+    def _is_async(self):
+        return False
+
+    def _run(
+        self,
+        key: tuple[str, str] | None,
+        inner: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if _in_worker():
+            return inner(args, kwargs) if self.wait else _completed(inner, args, kwargs)
+        if key is None:
+            future = self.pool.executor.submit(copy_context().run, inner, args, kwargs)
+        else:
+            # Worker processes cannot receive the inner function, so they find it
+            # by the name of the advised function.
+            future = self.pool.executor.submit(_call, key, args, kwargs)
+        return future.result() if self.wait else future
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        if iscoroutinefunction(target):
+            raise TypeError(
+                f"{target.__qualname__} is a coroutine function and cannot be offloaded"
+            )
+        # The chain is compiled again when more advice is applied to the function,
+        # so the inner chain compiled last replaces the previous one.
+        self._inner_chains.get(target, list)[:] = [
+            self._compile_inner(name, body, namespace)
+        ]
+        remote_key = (
+            (target.__module__, target.__qualname__) if self.pool.processes else None
+        )
+        namespace[f"{name}_run"] = partial(self._run, remote_key)
+        # The inner advice chain runs in its own function, so it can be run by a worker.
+        return (
+            [f"def {name}_inner(args, kwargs):"]
+            + _indent(body + ["return result"])
+            + [f"result = {name}_run({name}_inner, args, kwargs)"]
+        )
+
+    def _compile_inner(
+        self, name: str, body: list[str], namespace: dict[str, Any]
+    ) -> Callable[..., Any]:
+        # The inner advice chain as a function of its own, run by `map` without the outer
+        # advice. It shares the namespace, and so the state, of the inner advice with
+        # the wrapper, which is complete for the inner advice, since it is emitted first.
+        body = body + ["return result"]
+        if "join_points" in namespace:
+            body = (
+                [
+                    "join_point = join_points.pop() if join_points else JoinPoint()",
+                    "join_point._begin(target, args, kwargs)",
+                    "try:",
+                ]
+                + _indent(body)
+                + ["finally:", "    join_point._release(join_points)"]
+            )
+        return _instantiate(
+            f"{name}_chain",
+            [f"def {name}_chain(args, kwargs):"] + _indent(body),
+            dict(namespace),
+        )
+
+    def map(
+        self,
+        func: Callable[..., Any],
+        *iterables: Iterable[Any],
+        chunksize: int = 1,
+        timeout: float | None = None,
+    ) -> Iterator[Any]:
+        """
+        Executes a function decorated by this advice for every tuple of items
+        of the iterables in the pool, like `concurrent.futures.Executor.map`.
+        The parameter updates of this advice and of the advice inside of it are applied
+        to every call, but the advice outside of it is neither executed nor applies
+        its parameter updates.
+
+        Parameters
+        ----------
+        func : Callable
+            The decorated function.
+
+        iterables : Iterable
+            The iterables of the positional arguments.
+
+        chunksize : int
+            The number of calls sent to a worker process at once. Large chunks
+            lower the overhead of many short calls. Ignored by pools of threads.
+
+        timeout : float or None
+            The maximum number of seconds to wait for the results.
+
+        Returns
+        -------
+        Iterator
+            The results in the order of the items.
+
+        Raises
+        ------
+        ValueError
+            If the function is not decorated by this advice.
+        """
+
+        chain = get_advice_chain(getattr(func, "__func__", func))
+        advice = chain.advice if chain is not None else ()
+        position = next(
+            (index for index, item in enumerate(advice) if item is self), None
+        )
+        if position is None:
+            raise ValueError(f"{func.__qualname__} is not offloaded by this advice")
+        rewrite = _compile_for(
+            chain.target, _merged_params_update(chain.advice[position:])
+        )
+        calls = ((args, {}) for args in zip(*iterables))
+        if rewrite is not None:
+            calls = (rewrite(args, kwargs) for args, kwargs in calls)
+        if _in_worker() or not self.pool.processes:
+            # The inner advice chain compiled with the wrapper runs in this process.
+            (inner,) = self._inner_chains.get(chain.target, list)
+            if _in_worker():
+                return (inner(*arguments) for arguments in calls)
+            # Every call runs in a copy of the context of the caller, like the calls
+            # of the decorated function.
+            contexts = iter(copy_context, None)
+            return self.pool.executor.map(
+                partial(_run_packed, inner), contexts, calls, timeout=timeout
+            )
+        key = (chain.target.__module__, chain.target.__qualname__)
+        return self.pool.executor.map(
+            partial(_call_packed, key), calls, timeout=timeout, chunksize=chunksize
+        )
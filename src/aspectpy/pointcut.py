@@ -0,0 +1,225 @@
+from typing import Any
+import re
+
+from aspectpy.decorators import Advice
+from aspectpy.lazy import LazyJoinPoint
+from aspectpy.methods import (
+    SuperCallGuard,
+    advise_method,
+    is_method,
+    method_function,
+)
+
+# Patterns that name a single method, e.g. `^test$`, or all methods
+# starting with a prefix, e.g. `^test` or `^test.*`.
+_LITERAL = re.compile(r"^\^?([A-Za-z_][A-Za-z0-9_]*)(\$|\.\*)?$")
+
+
+class Pointcut:
+    """
+    Pointcut matching names of attributes with a regular expression using `re.match`,
+    like the pointcuts of the example `Aspect` metaclass. Regular expressions that only
+    name a single attribute or a prefix are recognized, so they can be matched with
+    a table lookup instead of a regular expression.
+
+    Parameters
+    ----------
+    pattern : str or re.Pattern
+        The regular expression.
+    """
+
+    def __init__(self, pattern: str | re.Pattern[str]):
+        self.regexp = re.compile(pattern)
+        self.name: str | None = None
+        self.prefix: str | None = None
+
+        literal = _LITERAL.match(self.regexp.pattern)
+        if literal is not None and self.regexp.flags == re.UNICODE:
+            if literal.group(2) == "$":
+                self.name = literal.group(1)
+            else:
+                self.prefix = literal.group(1)
+
+    def matches(self, name: str) -> bool:
+        return self.regexp.match(name) is not None
+
+
+class Pointcuts:
+    """
+    Set of pointcuts with the advice applied to the attributes they match. All pointcuts
+    are compiled into a single matcher, i.e. an exact-name table, a prefix table and one
+    combined regular expression, which rejects attribute names matched by no pointcut
+    at once. Regular expressions with groups or flags of their own are not combined
+    and are matched one by one. The advice matching a name is cached, so it is looked up only once per name
+    across all woven classes.
+
+    Advice is applied in the order of declaration, so the advice declared last is
+    the outermost one. Advice matched by several pointcuts is applied once, and weaving
+    is idempotent, so weaving a class again does not apply the advice twice.
+
+    Pointcuts can be applied to a class with the `weave` method used as a class decorator,
+    or with the metaclass returned by the `metaclass` method. Static methods, class
+    methods and properties are advised with `advise_method`, so they keep their kind.
+
+    Parameters
+    ----------
+    lazy : bool
+        Whether matched functions are replaced by a `LazyJoinPoint`, which weaves
+        the advice when the method is first accessed, instead of being woven eagerly.
+        Static methods, class methods and properties are always woven eagerly.
+
+    skip_super : bool
+        Whether the advice of matched methods is skipped when they are called through
+        `super()` by an advised method overriding them, so in a hierarchy of classes
+        woven by the same pointcuts, the advice runs once per top-level call.
+        See `SuperCallGuard`. Static methods are not guarded.
+    """
+
+    def __init__(self, lazy: bool = False, skip_super: bool = False):
+        self.lazy = lazy
+        self.skip_super = skip_super
+        self._super_guard = SuperCallGuard()
+        self.advice: list[tuple[Pointcut, Advice]] = []
+        self._cache: dict[str, tuple[Advice, ...]] = {}
+        self._names: dict[str, list[int]] = {}
+        self._prefixes: list[tuple[str, int]] = []
+        self._prefix_filter: tuple[str, ...] = ()
+        self._regexps: list[tuple[Pointcut, int]] = []
+        self._regexp_filter: re.Pattern[str] | None = None
+        self._unfiltered: list[tuple[Pointcut, int]] = []
+
+    def add(self, pointcut: Pointcut | str | re.Pattern[str], advice: Advice):
+        """
+        Declares advice applied to the attributes matched by the pointcut.
+
+        Parameters
+        ----------
+        pointcut : Pointcut or str or re.Pattern
+            The pointcut, or its regular expression.
+
+        advice : Advice
+            The advice.
+
+        Returns
+        -------
+        Pointcuts
+            This set of pointcuts, so declarations can be chained.
+        """
+
+        if not isinstance(pointcut, Pointcut):
+            pointcut = Pointcut(pointcut)
+        index = len(self.advice)
+        self.advice.append((pointcut, advice))
+
+        if pointcut.name is not None:
+            self._names.setdefault(pointcut.name, []).append(index)
+        elif pointcut.prefix is not None:
+            self._prefixes.append((pointcut.prefix, index))
+            self._prefix_filter = tuple(prefix for prefix, _ in self._prefixes)
+        elif pointcut.regexp.flags == re.UNICODE and not pointcut.regexp.groups:
+            self._regexps.append((pointcut, index))
+            self._regexp_filter = re.compile(
+                "|".join(f"(?:{item.regexp.pattern})" for item, _ in self._regexps)
+            )
+        else:
+            # Patterns with their own flags cannot be combined, and the groups of
+            # combined patterns are numbered again, which breaks backreferences,
+            # so they are matched one by one.
+            self._unfiltered.append((pointcut, index))
+        self._cache.clear()
+        return self
+
+    def match(self, name: str) -> tuple[Advice, ...]:
+        """
+        Returns the advice applied to the attribute with the name,
+        in the order of declaration.
+        """
+
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached
+
+        indices = list(self._names.get(name, ()))
+        if self._prefix_filter and name.startswith(self._prefix_filter):
+            indices += [index for prefix, index in self._prefixes if name.startswith(prefix)]
+        if self._regexp_filter is not None and self._regexp_filter.match(name):
+            indices += [index for item, index in self._regexps if item.matches(name)]
+        indices += [index for item, index in self._unfiltered if item.matches(name)]
+        indices.sort()
+
+        matched: tuple[Advice, ...] = ()
+        for index in indices:
+            advice = self.advice[index][1]
+            if not any(item is advice for item in matched):
+                matched += (advice,)
+        self._cache[name] = matched
+        return matched
+
+    def weave_namespace(self, namespace: dict[str, Any]) -> dict[str, Any]:
+        """
+        Applies the matching advice to the methods of a class namespace.
+
+        Parameters
+        ----------
+        namespace : dict
+            The namespace, which is updated in place.
+
+        Returns
+        -------
+        dict
+            The same namespace.
+        """
+
+        for attr_name, attr_value in list(namespace.items()):
+            if not is_method(attr_value):
+                continue
+            advice = self.match(attr_name)
+            if not advice:
+                continue
+            if self.skip_super and not isinstance(attr_value, staticmethod):
+                advice += (self._super_guard,)
+            if isinstance(attr_value, LazyJoinPoint):
+                # A lazy join point woven again only gets the advice it does not have.
+                added = tuple(
+                    item
+                    for item in advice
+                    if not any(item is woven for woven in attr_value.advice)
+                )
+                if added:
+                    namespace[attr_name] = LazyJoinPoint(
+                        attr_value.target, attr_value.advice + added
+                    )
+                continue
+            if self.lazy and method_function(attr_value) is attr_value:
+                namespace[attr_name] = LazyJoinPoint(attr_value, advice)
+                continue
+            namespace[attr_name] = advise_method(attr_value, advice)
+        return namespace
+
+    def weave(self, cls: type) -> type:
+        """
+        Class decorator that applies the matching advice to the methods of the class.
+        """
+
+        for attr_name, attr_value in self.weave_namespace(dict(vars(cls))).items():
+            if attr_value is not vars(cls)[attr_name]:
+                setattr(cls, attr_name, attr_value)
+                set_name = getattr(type(attr_value), "__set_name__", None)
+                if set_name is not None:
+                    set_name(attr_value, cls, attr_name)
+        return cls
+
+    def metaclass(self) -> type:
+        """
+        Returns a metaclass that applies the matching advice to the methods of its classes.
+        """
+
+        pointcuts = self
+
+        class PointcutAspect(type):
+            def __new__(cls, name, bases, namespace):
+                pointcuts.weave_namespace(namespace)
+                return super().__new__(cls, name, bases, namespace)
+
+        return PointcutAspect
+
@@ -0,0 +1,247 @@
+from array import array
+from inspect import iscoroutinefunction
+from threading import Lock, local
+from time import perf_counter_ns, thread_time_ns
+from typing import Any, NamedTuple
+from weakref import finalize, ref
+
+from aspectpy.decorators import Advice, _TargetStates
+
+# Bucket `i` counts durations of `2 ** (i - 1)` up to `2 ** i - 1` nanoseconds.
+BUCKETS = 64
+
+# Longest duration that fits into the last bucket.
+_LIMIT = (1 << (BUCKETS - 1)) - 1
+
+# Layout of the per-thread totals array.
+_COUNT, _WALL_MAX, _CPU_MAX, _WALL_SUM, _CPU_SUM = range(5)
+
+
+class TimingSnapshot(NamedTuple):
+    """
+    Latency statistics of a join point. Durations are in seconds. Percentiles are the
+    upper bounds of the histogram buckets they fall into, so they are accurate to
+    a factor of two.
+    """
+
+    count: int
+    p50: float
+    p99: float
+    max: float
+    mean: float
+    cpu_p50: float
+    cpu_p99: float
+    cpu_max: float
+    cpu_mean: float
+
+
+def _percentile(buckets: array, count: int, fraction: float, maximum: int) -> float:
+    rank = fraction * count
+    seen = 0
+    for index, bucket in enumerate(buckets):
+        seen += bucket
+        if seen >= rank and bucket:
+            return min((1 << index) - 1, maximum) / 1e9
+    return maximum / 1e9
+
+
+def _new_arrays() -> tuple[array, array]:
+    return array("Q", bytes(8 * 2 * BUCKETS)), array("Q", bytes(8 * 5))
+
+
+def _merge(into: tuple[array, array], arrays: tuple[array, array]):
+    (into_buckets, into_totals), (buckets, totals) = into, arrays
+    for index in range(2 * BUCKETS):
+        into_buckets[index] += buckets[index]
+    into_totals[_COUNT] += totals[_COUNT]
+    into_totals[_WALL_SUM] += totals[_WALL_SUM]
+    into_totals[_CPU_SUM] += totals[_CPU_SUM]
+    into_totals[_WALL_MAX] = max(into_totals[_WALL_MAX], totals[_WALL_MAX])
+    into_totals[_CPU_MAX] = max(into_totals[_CPU_MAX], totals[_CPU_MAX])
+
+
+class _ThreadExit:
+    """
+    Object kept by a thread in its thread-local storage, which is freed when
+    the thread exits.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+def _retire(histogram: "ref[LatencyHistogram]", arrays: tuple[array, array]):
+    item = histogram()
+    if item is not None:
+        item._retire(arrays)
+
+
+class LatencyHistogram:
+    """
+    Histogram of wall and CPU times of the calls of a single join point, with fixed
+    log-scale buckets. Every thread records into its own preallocated arrays, so
+    recording needs neither a lock nor an allocation, and the arrays of all threads
+    are merged when the histogram is read. The arrays of a thread are merged into
+    the totals of the exited threads and freed when the thread exits.
+    """
+
+    def __init__(self):
+        self._local = local()
+        self._threads: list[tuple[array, array]] = []
+        self._exited = _new_arrays()
+        self._lock = Lock()
+
+    def _thread_arrays(self) -> tuple[array, array]:
+        arrays = _new_arrays()
+        self._local.arrays = arrays
+        self._local.exit = _ThreadExit()
+        finalize(self._local.exit, _retire, ref(self), arrays)
+        with self._lock:
+            self._threads.append(arrays)
+        return arrays
+
+    def _retire(self, arrays: tuple[array, array]):
+        with self._lock:
+            self._threads = [item for item in self._threads if item is not arrays]
+            _merge(self._exited, arrays)
+
+    def record(self, wall_ns: int, cpu_ns: int):
+        """
+        Records the wall and CPU time of a call in nanoseconds.
+        """
+
+        try:
+            buckets, totals = self._local.arrays
+        except AttributeError:
+            buckets, totals = self._thread_arrays()
+        if wall_ns > _LIMIT:
+            wall_ns = _LIMIT
+        if cpu_ns > _LIMIT:
+            cpu_ns = _LIMIT
+        elif cpu_ns < 0:
+            cpu_ns = 0
+        buckets[wall_ns.bit_length()] += 1
+        buckets[BUCKETS + cpu_ns.bit_length()] += 1
+        totals[_COUNT] += 1
+        totals[_WALL_SUM] += wall_ns
+        totals[_CPU_SUM] += cpu_ns
+        if wall_ns > totals[_WALL_MAX]:
+            totals[_WALL_MAX] = wall_ns
+        if cpu_ns > totals[_CPU_MAX]:
+            totals[_CPU_MAX] = cpu_ns
+
+    def snapshot(self) -> TimingSnapshot:
+        """
+        Merges the arrays of all threads and returns the statistics.
+        """
+
+        buckets, totals = merged = _new_arrays()
+        with self._lock:
+            _merge(merged, self._exited)
+            threads = list(self._threads)
+        for arrays in threads:
+            _merge(merged, arrays)
+
+        count = totals[_COUNT]
+        wall, cpu = buckets[:BUCKETS], buckets[BUCKETS:]
+        wall_max, cpu_max = totals[_WALL_MAX], totals[_CPU_MAX]
+        return TimingSnapshot(
+            count,
+            _percentile(wall, count, 0.5, wall_max),
+            _percentile(wall, count, 0.99, wall_max),
+            wall_max / 1e9,
+            totals[_WALL_SUM] / count / 1e9 if count else 0.0,
+            _percentile(cpu, count, 0.5, cpu_max),
+            _percentile(cpu, count, 0.99, cpu_max),
+            cpu_max / 1e9,
+            totals[_CPU_SUM] / count / 1e9 if count else 0.0,
+        )
+
+    def reset(self):
+        """
+        Clears the recorded calls of all threads.
+        """
+
+        with self._lock:
+            for thread_buckets, thread_totals in [self._exited, *self._threads]:
+                for index in range(len(thread_buckets)):
+                    thread_buckets[index] = 0
+                for index in range(len(thread_totals)):
+                    thread_totals[index] = 0
+
+
+class Timed(Advice):
+    """
+    Decorator that records the wall time and the CPU time of the calls of the decorated
+    function, including the inner advice, into a `LatencyHistogram`. Calls that throw an
+    exception are recorded as well. Every decorated function gets its own histogram,
+    which is kept when more advice is applied to the function, so a single `Timed`
+    instance can profile a whole class through a pointcut. The histograms are available
+    in `histograms` by the qualified names of the functions, where functions with
+    the same qualified name, e.g. closures, are told apart by their identity.
+
+    CPU time is the CPU time of the calling thread. It is not recorded for coroutine
+    functions, since other tasks run on the same thread while the coroutine awaits.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(self, params_update: dict[str, Any] | None = None):
+        self.params_update = params_update
+        self._histograms = _TargetStates()
+
+    @property
+    def histograms(self) -> dict[str, LatencyHistogram]:
+        """
+        The histograms of the decorated functions by their qualified names.
+        """
+
+        return self._histograms.named()
+
+    def snapshot(self) -> dict[str, TimingSnapshot]:
+        """
+        Returns the statistics of every decorated function by its qualified name,
+        told apart by its identity if other decorated functions share the name.
+        """
+
+        return {name: item.snapshot() for name, item in self.histograms.items()}
+
+    def reset(self):
+        """
+        Clears the recorded calls of all decorated functions.
+        """
+
+        for item in self._histograms.values():
+            item.reset()
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        histogram = self._histograms.get(target, LatencyHistogram)
+        namespace[f"{name}_record"] = histogram.record
+        namespace["perf_counter_ns"] = perf_counter_ns
+        namespace["thread_time_ns"] = thread_time_ns
+
+        if iscoroutinefunction(target):
+            start, cpu = [], "0"
+        else:
+            start, cpu = [f"{name}_cpu = thread_time_ns()"], f"thread_time_ns() - {name}_cpu"
+        return (
+            start
+            + [f"{name}_wall = perf_counter_ns()", "try:"]
+            + ["    " + line for line in body]
+            + [
+                "finally:",
+                f"    {name}_record(perf_counter_ns() - {name}_wall, {cpu})",
+            ]
+        )
@@ -0,0 +1,215 @@
+from threading import RLock
+from typing import Any, Callable, Type
+import re
+import sys
+
+from aspectpy.decorators import WOVEN_FUNCTIONS, Advice, get_advice_chain
+from aspectpy.lazy import PENDING_JOIN_POINTS
+from aspectpy.methods import method_function, replace_function
+from aspectpy.pointcut import Pointcut
+
+# Woven functions which are currently replaced by their original function,
+# mapped to the owner and the attribute name they were taken from.
+_disabled: dict[Callable[..., Any], tuple[Any, str]] = {}
+_lock = RLock()
+
+
+class WovenJoinPoint:
+    """
+    Function woven by the advice decorators, together with the place where it is stored,
+    i.e. the class or module that owns it and the attribute name. The place is found
+    from the module and the qualified name of the original function, so functions
+    defined inside other functions cannot be located. Static and class methods are
+    located inside their descriptors, but the functions of properties are not.
+
+    Parameters
+    ----------
+    woven : Callable
+        The woven function.
+    """
+
+    def __init__(self, woven: Callable[..., Any]):
+        chain = get_advice_chain(woven)
+        self.woven = woven
+        self.target = chain.target
+        self.advice = chain.advice
+        self.name: str = getattr(self.target, "__name__", "")
+        self.owner: Any = None
+
+        location = _disabled.get(woven)
+        if location is not None:
+            self.owner, self.name = location
+        else:
+            self.owner = _locate_owner(self.target)
+
+    @property
+    def enabled(self) -> bool:
+        return self.woven not in _disabled
+
+    @property
+    def located(self) -> bool:
+        return self.owner is not None and (
+            not self.enabled
+            or method_function(getattr(self.owner, "__dict__", {}).get(self.name))
+            is self.woven
+        )
+
+    def disable(self) -> bool:
+        """
+        Replaces the woven function by the original function in its owner.
+        Returns `False` if the join point is already disabled or cannot be located.
+        """
+
+        with _lock:
+            if not self.enabled or not self.located:
+                return False
+            self._replace(self.target)
+            _disabled[self.woven] = (self.owner, self.name)
+            return True
+
+    def enable(self) -> bool:
+        """
+        Puts the woven function back into its owner.
+        Returns `False` if the join point is already enabled.
+        """
+
+        with _lock:
+            if self.enabled:
+                return False
+            self._replace(self.woven)
+            del _disabled[self.woven]
+            return True
+
+    def unweave(self) -> bool:
+        """
+        Replaces the woven function by the original function for good and removes the join
+        point from the registry. Returns `False` if the join point cannot be located.
+        """
+
+        with _lock:
+            if self.enabled and not self.disable():
+                return False
+            del _disabled[self.woven]
+            WOVEN_FUNCTIONS.discard(self.woven)
+            return True
+
+    def _replace(self, func: Callable[..., Any]):
+        # Static and class methods are replaced together with their descriptors.
+        method = vars(self.owner).get(self.name)
+        setattr(self.owner, self.name, replace_function(method, func))
+
+
+def _locate_owner(func: Callable[..., Any]) -> Any:
+    qualname = getattr(func, "__qualname__", "")
+    if "<locals>" in qualname:
+        return None
+    owner: Any = sys.modules.get(getattr(func, "__module__", None) or "")
+    for part in qualname.split(".")[:-1]:
+        owner = getattr(owner, part, None)
+    return owner
+
+
+def _matches(
+    name: str | None,
+    advice: tuple[Advice, ...],
+    pointcut: Pointcut | None,
+    advice_type: Type[Advice] | None,
+) -> bool:
+    if pointcut is not None and not pointcut.matches(name or ""):
+        return False
+    if advice_type is not None:
+        return any(isinstance(item, advice_type) for item in advice)
+    return True
+
+
+def join_points(
+    pointcut: Pointcut | str | re.Pattern[str] | None = None,
+    advice_type: Type[Advice] | None = None,
+) -> list[WovenJoinPoint]:
+    """
+    Returns the woven join points, both enabled and disabled. Lazy join points that
+    match are woven and put in place of their placeholders first, so that they can be
+    disabled before they are used.
+
+    Parameters
+    ----------
+    pointcut : Pointcut or str or re.Pattern or None
+        Pointcut matched against the names of the join points. If `None`, all names match.
+
+    advice_type : type or None
+        Only join points with advice of this type are returned. If `None`, all are returned.
+
+    Returns
+    -------
+    list
+        The matching join points.
+    """
+
+    if pointcut is not None and not isinstance(pointcut, Pointcut):
+        pointcut = Pointcut(pointcut)
+    with _lock:
+        for placeholder in list(PENDING_JOIN_POINTS):
+            if _matches(placeholder.name, placeholder.advice, pointcut, advice_type):
+                placeholder.install()
+        woven = list(WOVEN_FUNCTIONS)
+    result = []
+    for func in woven:
+        if get_advice_chain(func) is None:
+            continue
+        join_point = WovenJoinPoint(func)
+        if _matches(join_point.name, join_point.advice, pointcut, advice_type):
+            result.append(join_point)
+    return result
+
+
+def disable(
+    pointcut: Pointcut | str | re.Pattern[str] | None = None,
+    advice_type: Type[Advice] | None = None,
+) -> int:
+    """
+    Disables the matching join points by putting their original functions back in place,
+    so a disabled join point costs nothing when it is called. See `join_points` for the
+    parameters.
+
+    Returns
+    -------
+    int
+        The number of join points that were disabled.
+    """
+
+    with _lock:
+        return sum(item.disable() for item in join_points(pointcut, advice_type))
+
+
+def enable(
+    pointcut: Pointcut | str | re.Pattern[str] | None = None,
+    advice_type: Type[Advice] | None = None,
+) -> int:
+    """
+    Enables the matching disabled join points. See `join_points` for the parameters.
+
+    Returns
+    -------
+    int
+        The number of join points that were enabled.
+    """
+
+    with _lock:
+        return sum(item.enable() for item in join_points(pointcut, advice_type))
+
+
+def unweave(
+    pointcut: Pointcut | str | re.Pattern[str] | None = None,
+    advice_type: Type[Advice] | None = None,
+) -> int:
+    """
+    Unweaves the matching join points for good. See `join_points` for the parameters.
+
+    Returns
+    -------
+    int
+        The number of join points that were unweaved.
+    """
+
+    with _lock:
+        return sum(item.unweave() for item in join_points(pointcut, advice_type))
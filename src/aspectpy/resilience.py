@@ -0,0 +1,374 @@
+from inspect import iscoroutinefunction
+from random import random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any, Callable, NamedTuple, Type
+
+from aspectpy.decorators import Advice, _TargetStates, _indent
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RetryPolicy(NamedTuple):
+    """
+    How calls that throw an exception are retried.
+
+    Parameters
+    ----------
+    attempts : int
+        The maximum number of attempts, including the first call.
+
+    backoff : float
+        The number of seconds to wait before the first retry.
+
+    multiplier : float
+        The factor the delay grows by with every further retry.
+
+    max_backoff : float
+        The maximum number of seconds to wait before a retry.
+
+    jitter : float
+        The fraction of the delay by which it is randomly shortened or prolonged,
+        so that clients retrying at the same time spread out.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.1
+    multiplier: float = 2.0
+    max_backoff: float = 10.0
+    jitter: float = 0.1
+
+    def delay(self, retry: int) -> float:
+        """
+        Returns the number of seconds to wait before the retry with the index, from 0.
+        """
+
+        delay = min(self.backoff * self.multiplier**retry, self.max_backoff)
+        return delay * (1.0 + self.jitter * (2.0 * random() - 1.0))
+
+
+class RetryStats:
+    """
+    Counts of the retries of a single join point. The counts are not locked, so they
+    can miss a few calls when several threads retry the join point at the same time.
+    """
+
+    def __init__(self, policies: dict[Type[BaseException], RetryPolicy]):
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._policies = policies
+        self._lookup: dict[type, RetryPolicy | None] = {}
+
+    def policy(self, error_type: type) -> RetryPolicy | None:
+        """
+        Returns the policy of the most specific exception class the type is a subclass of.
+        """
+
+        try:
+            return self._lookup[error_type]
+        except KeyError:
+            pass
+        policy = next(
+            (self._policies[cls] for cls in error_type.__mro__ if cls in self._policies),
+            None,
+        )
+        self._lookup[error_type] = policy
+        return policy
+
+    def next_delay(self, error: BaseException, retry: int) -> float | None:
+        """
+        Returns the number of seconds to wait before the retry with the index,
+        or `None` if the exception is not retried anymore.
+        """
+
+        policy = self.policy(type(error))
+        if policy is None or retry + 1 >= policy.attempts:
+            if policy is not None:
+                self.exhausted += 1
+            return None
+        self.retries += 1
+        return policy.delay(retry)
+
+
+class Retry(Advice):
+    """
+    Decorator that calls the decorated function again when it throws an exception,
+    with an exponentially growing delay between the attempts. Every exception class
+    has its own `RetryPolicy`, and the policy of the most specific class an exception
+    is an instance of is applied to it. Exceptions without a policy are not retried.
+    When the attempts of a policy are exhausted, the last exception is raised.
+
+    The delays block the calling thread, or are awaited with `asyncio.sleep` when
+    the decorated function is a coroutine function. Every decorated function gets its
+    own `RetryStats`, which are kept when more advice is applied to the function,
+    available in `stats` by the qualified name of the function.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    policies : RetryPolicy or dict
+        The policies by exception class. A single policy is applied to all exceptions.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+
+    Raises
+    ------
+    ValueError
+        If a policy does not allow at least one attempt.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None = None,
+        policies: RetryPolicy | dict[Type[BaseException], RetryPolicy] = RetryPolicy(),
+    ):
+        if isinstance(policies, RetryPolicy):
+            policies = {Exception: policies}
+        for exception, policy in policies.items():
+            if policy.attempts < 1:
+                raise ValueError(
+                    f"the policy of {exception.__name__} must allow at least one attempt"
+                )
+        self.params_update = params_update
+        self.policies = dict(policies)
+        self.stats: dict[str, RetryStats] = {}
+        self._stats = _TargetStates()
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        stats = self._stats.get(target, lambda: RetryStats(self.policies))
+        self.stats[getattr(target, "__qualname__", repr(target))] = stats
+        namespace[f"{name}_exceptions"] = tuple(self.policies)
+        namespace[f"{name}_next_delay"] = stats.next_delay
+        namespace[f"{name}_stats"] = stats
+
+        if iscoroutinefunction(target):
+            from asyncio import sleep as async_sleep
+
+            namespace["async_sleep"] = async_sleep
+            wait = f"await async_sleep({name}_delay)"
+        else:
+            namespace["sleep"] = sleep
+            wait = f"sleep({name}_delay)"
+        return [
+            f"{name}_retry = 0",
+            "while True:",
+            "    try:",
+        ] + _indent(_indent(body)) + [
+            "        break",
+            f"    except {name}_exceptions as {name}_error:",
+            f"        {name}_delay = {name}_next_delay({name}_error, {name}_retry)",
+            f"        if {name}_delay is None:",
+            "            raise",
+            f"    {name}_retry += 1",
+            f"    {wait}",
+            f"if {name}_retry:",
+            f"    {name}_stats.recovered += 1",
+        ]
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised by a function decorated with `CircuitBreaker` while its circuit is open.
+    """
+
+
+class Circuit:
+    """
+    State of the circuit of a single join point, shared by all threads. The circuit
+    is closed while calls succeed. It opens after `failure_threshold` consecutive
+    failures, and then rejects all calls until `reset_timeout` seconds pass. After that,
+    it is half-open and lets `half_open_calls` probing calls through. The circuit closes
+    when a probe succeeds and opens again when a probe fails.
+
+    The numbers of transitions into every state and of rejected calls are counted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_calls: int,
+        on_transition: Callable[[str, str, str], Any] | None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_transition = on_transition
+
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.transitions = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = Lock()
+
+    def before(self):
+        """
+        Lets a call through, or raises `CircuitOpenError` if the call is rejected.
+        """
+
+        if self.state is CLOSED:
+            return
+        with self._lock:
+            if self.state is OPEN:
+                if monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"the circuit of {self.name} is open")
+                self._transition(HALF_OPEN)
+            if self.state is HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"the circuit of {self.name} is half-open")
+                self._probes += 1
+
+    def success(self):
+        """
+        Records a successful call.
+        """
+
+        if self.state is CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.failures = 0
+            if self.state is HALF_OPEN:
+                self._transition(CLOSED)
+
+    def failure(self):
+        """
+        Records a failed call.
+        """
+
+        with self._lock:
+            self.failures += 1
+            if self.state is HALF_OPEN or (
+                self.state is CLOSED and self.failures >= self.failure_threshold
+            ):
+                self._transition(OPEN)
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        self.transitions[state] += 1
+        self._probes = 0
+        if state is OPEN:
+            self._opened_at = monotonic()
+        elif state is CLOSED:
+            self.failures = 0
+        if self.on_transition is not None:
+            self.on_transition(self.name, previous, state)
+
+
+class CircuitBreaker(Advice):
+    """
+    Decorator that stops calling the decorated function after it fails repeatedly,
+    and raises `CircuitOpenError` immediately instead, until the function is probed
+    again after a cool-down. Every decorated function has its own `Circuit`, which is
+    kept when more advice is applied to the function, available in `circuits` by
+    the qualified name of the function. A fallback can be provided by an outer
+    `AfterThrowing` advice catching `CircuitOpenError`.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    exceptions : Exception or tuple of Exceptions or None
+        The exceptions counted as failures. Other exceptions count as successful calls,
+        since they do not indicate an outage. If `None`, all exceptions are failures.
+
+    failure_threshold : int
+        The number of consecutive failures that opens the circuit.
+
+    reset_timeout : float
+        The number of seconds the circuit stays open before it is probed.
+
+    half_open_calls : int
+        The number of calls let through to probe a half-open circuit.
+
+    on_transition : Callable or None
+        Called with the qualified name of the function, the previous state and the new
+        state on every transition, while the circuit is locked.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+
+    Raises
+    ------
+    ValueError
+        If the threshold or the number of probing calls is less than 1.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None = None,
+        exceptions: tuple[Type[Exception], ...] | Type[Exception] | None = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        on_transition: Callable[[str, str, str], Any] | None = None,
+    ):
+        if failure_threshold < 1:
+            raise ValueError(
+                f"failure_threshold must be at least 1, got {failure_threshold}"
+            )
+        if half_open_calls < 1:
+            raise ValueError(f"half_open_calls must be at least 1, got {half_open_calls}")
+        self.params_update = params_update
+        self.exceptions = exceptions or Exception
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_transition = on_transition
+        self.circuits: dict[str, Circuit] = {}
+        self._circuits = _TargetStates()
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        qualname = getattr(target, "__qualname__", repr(target))
+        circuit = self._circuits.get(
+            target,
+            lambda: Circuit(
+                qualname,
+                self.failure_threshold,
+                self.reset_timeout,
+                self.half_open_calls,
+                self.on_transition,
+            ),
+        )
+        self.circuits[qualname] = circuit
+        namespace[f"{name}_circuit"] = circuit
+        namespace[f"{name}_exceptions"] = self.exceptions
+        return (
+            [f"{name}_circuit.before()", "try:"]
+            + _indent(body)
+            + [
+                f"except {name}_exceptions:",
+                f"    {name}_circuit.failure()",
+                "    raise",
+                "except BaseException:",
+                f"    {name}_circuit.success()",
+                "    raise",
+                f"{name}_circuit.success()",
+            ]
+        )
@@ -0,0 +1,186 @@
+from abc import ABC, abstractmethod
+from itertools import count
+from random import Random
+from threading import Lock, local
+from time import monotonic
+from typing import Any, Callable
+
+from aspectpy.decorators import ACTION_SAMPLER
+
+
+class Sampler(ABC):
+    """
+    Base class of samplers, which decide on every call of a join point whether
+    its advice is executed. An action is marked to be sampled with the `sample` method.
+    Sampled actions only have side effects, so the sampled and the skipped calls behave
+    the same: the result of a sampled `AfterReturning` action is discarded, a sampled
+    `AfterThrowing` action is executed before the exception is raised again, and advice
+    with a sampled action cannot update parameters.
+
+    The `sampled` and `skipped` counters are not locked, so they can miss
+    a few calls when several threads call the join point at the same time.
+    """
+
+    def __init__(self):
+        self.sampled = 0
+        self.skipped = 0
+
+    @abstractmethod
+    def __call__(self) -> bool:
+        """
+        Returns whether the current call is sampled and counts it.
+        """
+
+    def sample(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorator that marks an action of `Before`, `AfterReturning` or `AfterThrowing`
+        to be executed only on the calls selected by this sampler.
+
+        Parameters
+        ----------
+        func : Callable
+            The action.
+
+        Returns
+        -------
+        Callable
+            The same action.
+
+        Raises
+        ------
+        ValueError
+            If the action is already sampled.
+        """
+
+        if getattr(func, ACTION_SAMPLER, None) is not None:
+            raise ValueError(f"{func.__qualname__} is already sampled")
+        setattr(func, ACTION_SAMPLER, self)
+        return func
+
+
+class EveryN(Sampler):
+    """
+    Sampler that selects the first call and then every `n`-th call.
+
+    Parameters
+    ----------
+    n : int
+        The sampling interval.
+
+    Raises
+    ------
+    ValueError
+        If `n` is not positive.
+    """
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError(f"n must be positive, got {n}")
+        super().__init__()
+        self.n = n
+        self._calls = count()
+
+    def __call__(self) -> bool:
+        if next(self._calls) % self.n:
+            self.skipped += 1
+            return False
+        self.sampled += 1
+        return True
+
+
+class Probability(Sampler):
+    """
+    Sampler that selects every call with a probability. Every thread draws from its
+    own random number generator, so the threads do not share any state.
+
+    Parameters
+    ----------
+    probability : float
+        The probability of a call being sampled, from 0 to 1.
+
+    seed : int or None
+        Seed of the generators. The generator of every thread is seeded with the seed
+        and the index of the thread. If `None`, the generators are seeded randomly.
+
+    Raises
+    ------
+    ValueError
+        If the probability is not between 0 and 1.
+    """
+
+    def __init__(self, probability: float, seed: int | None = None):
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(f"probability must be between 0 and 1, got {probability}")
+        super().__init__()
+        self.probability = probability
+        self.seed = seed
+        self._local = local()
+        self._threads = count()
+
+    def _thread_random(self) -> Callable[[], float]:
+        thread = next(self._threads)
+        seed = None if self.seed is None else hash((self.seed, thread))
+        random = Random(seed).random
+        self._local.random = random
+        return random
+
+    def __call__(self) -> bool:
+        try:
+            random = self._local.random
+        except AttributeError:
+            random = self._thread_random()
+        if random() < self.probability:
+            self.sampled += 1
+            return True
+        self.skipped += 1
+        return False
+
+
+class RateLimit(Sampler):
+    """
+    Sampler that selects at most `per_second` calls per second on average,
+    using a token bucket shared by all threads. The bucket holds at most `burst`
+    tokens, so up to `burst` calls can be sampled at once after an idle period.
+
+    Parameters
+    ----------
+    per_second : float
+        The number of tokens added to the bucket every second.
+
+    burst : float or None
+        The capacity of the bucket. If `None`, it is `max(per_second, 1)`.
+
+    Raises
+    ------
+    ValueError
+        If `per_second` is not positive or `burst` is less than 1.
+    """
+
+    def __init__(self, per_second: float, burst: float | None = None):
+        if per_second <= 0:
+            raise ValueError(f"per_second must be positive, got {per_second}")
+        if burst is None:
+            burst = max(per_second, 1.0)
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def __call__(self) -> bool:
+        with self._lock:
+            now = monotonic()
+            tokens = self._tokens + (now - self._updated) * self.per_second
+            if tokens > self.burst:
+                tokens = self.burst
+            self._updated = now
+            if tokens >= 1.0:
+                self._tokens = tokens - 1.0
+                self.sampled += 1
+                return True
+            self._tokens = tokens
+            self.skipped += 1
+            return False
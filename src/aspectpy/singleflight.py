@@ -0,0 +1,188 @@
+from inspect import iscoroutinefunction, signature
+from threading import Event, Lock
+from typing import Any, Hashable
+
+from aspectpy.cache import compile_cache_key
+from aspectpy.decorators import Advice, _TargetStates, _indent
+
+
+class Flight:
+    """
+    Call of a decorated function in flight, which the concurrent calls with the same
+    key wait for. Threads wait on an event, created when the first of them joins,
+    and coroutines on a future of the event loop of the call.
+    """
+
+    __slots__ = ("key", "result", "error", "_event", "_future")
+
+    def __init__(self, key: Hashable, future: Any = None):
+        self.key = key
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self._event: Event | None = None
+        self._future = future
+
+    def wait(self) -> Any:
+        """
+        Waits until the call returns and returns its result, or raises its exception.
+        """
+
+        self._event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    async def wait_async(self) -> Any:
+        """
+        Awaits the call and returns its result, or raises its exception.
+        """
+
+        from asyncio import shield
+
+        await shield(self._future)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _land(self, result: Any, error: BaseException | None):
+        self.result = result
+        self.error = error
+        if self._event is not None:
+            self._event.set()
+        elif self._future is not None and not self._future.done():
+            self._future.set_result(None)
+
+
+class Flights:
+    """
+    The calls in flight of a single join point by their keys.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights: dict[Hashable, Flight] = {}
+        self._lock = Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """
+        The number of distinct calls in flight.
+        """
+
+        return len(self._flights)
+
+    def join(self, key: Hashable) -> tuple[Flight, bool]:
+        """
+        Returns the flight of the key and whether the caller is its leader,
+        i.e. whether it has to execute the call.
+        """
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                if flight._event is None:
+                    flight._event = Event()
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Flight(key)
+            self.leaders += 1
+            return flight, True
+
+    def join_async(self, key: Hashable) -> tuple[Flight, bool]:
+        """
+        Same as `join`, for calls of coroutines. Only calls running in the same event
+        loop are coalesced.
+        """
+
+        from asyncio import get_running_loop
+
+        loop = get_running_loop()
+        key = (loop, key)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Flight(key, loop.create_future())
+            self.leaders += 1
+            return flight, True
+
+    def land(self, flight: Flight, result: Any, error: BaseException | None):
+        """
+        Ends the flight with the result or the exception of the call.
+        Later calls with the same key start a new flight.
+        """
+
+        with self._lock:
+            del self._flights[flight.key]
+        flight._land(result, error)
+
+
+class SingleFlight(Advice):
+    """
+    Decorator that coalesces concurrent calls of the decorated function with the same
+    arguments. The first call, the leader, executes the function and the inner advice,
+    and the calls with the same arguments that arrive before the leader returns wait
+    for it and return its result, or raise its exception, instead of executing.
+    Nothing is kept after the leader returns, so unlike `Cached`, later calls execute
+    the function again.
+
+    The calls are keyed by their arguments after the parameter updates, bound to the
+    parameters of the decorated function like the keys of `Cached`, so all the arguments
+    must be hashable. Coroutine calls are coalesced only with calls running in the same
+    event loop. If the leading coroutine is cancelled, the waiting ones are cancelled too.
+
+    Every decorated function gets its own `Flights`, which are kept when more advice
+    is applied to the function, available in `flights` by the qualified name of the
+    function, with the `leaders` and `coalesced` counters.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(self, params_update: dict[str, Any] | None = None):
+        self.params_update = params_update
+        self.flights: dict[str, Flights] = {}
+        self._flights = _TargetStates()
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        flights = self._flights.get(target, Flights)
+        self.flights[getattr(target, "__qualname__", repr(target))] = flights
+        namespace[f"{name}_key"] = compile_cache_key(signature(target))
+        namespace[f"{name}_land"] = flights.land
+
+        if iscoroutinefunction(target):
+            namespace[f"{name}_join"] = flights.join_async
+            wait = f"await {name}_flight.wait_async()"
+        else:
+            namespace[f"{name}_join"] = flights.join
+            wait = f"{name}_flight.wait()"
+        return (
+            [
+                f"{name}_flight, {name}_leader = {name}_join({name}_key(args, kwargs))",
+                f"if {name}_leader:",
+                "    try:",
+            ]
+            + _indent(_indent(body))
+            + [
+                f"    except BaseException as {name}_error:",
+                f"        {name}_land({name}_flight, None, {name}_error)",
+                "        raise",
+                f"    {name}_land({name}_flight, result, None)",
+                "else:",
+                f"    result = {wait}",
+            ]
+        )
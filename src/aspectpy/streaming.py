@@ -0,0 +1,301 @@
+from inspect import isasyncgenfunction, iscoroutinefunction, signature
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Type
+
+from aspectpy.decorators import Advice
+
+
+def _close(iterator: Any):
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+async def _aclose(iterator: Any):
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+def _yielding(
+    iterable: Iterable[Any], action: Callable[..., Any], args: tuple, kwargs: dict
+) -> Iterator[Any]:
+    iterator = iter(iterable)
+    try:
+        for item in iterator:
+            yield action(item, *args, **kwargs)
+    finally:
+        _close(iterator)
+
+
+async def _async_yielding(
+    iterator: AsyncIterator[Any], action: Callable[..., Any], args: tuple, kwargs: dict
+) -> AsyncIterator[Any]:
+    try:
+        async for item in iterator:
+            yield action(item, *args, **kwargs)
+    finally:
+        await _aclose(iterator)
+
+
+def _exhausted(
+    iterable: Iterable[Any],
+    start: float,
+    action: Callable[..., Any],
+    args: tuple,
+    kwargs: dict,
+) -> Iterator[Any]:
+    count = 0
+    iterator = iter(iterable)
+    try:
+        for item in iterator:
+            count += 1
+            yield item
+    finally:
+        _close(iterator)
+    action(count, perf_counter() - start, *args, **kwargs)
+
+
+async def _async_exhausted(
+    iterator: AsyncIterator[Any],
+    start: float,
+    action: Callable[..., Any],
+    args: tuple,
+    kwargs: dict,
+) -> AsyncIterator[Any]:
+    count = 0
+    try:
+        async for item in iterator:
+            count += 1
+            yield item
+    finally:
+        await _aclose(iterator)
+    action(count, perf_counter() - start, *args, **kwargs)
+
+
+def _throwing(
+    iterable: Iterable[Any],
+    exceptions: tuple[Type[Exception], ...] | Type[Exception],
+    action: Callable[..., Any],
+    args: tuple,
+    kwargs: dict,
+) -> Iterator[Any]:
+    iterator = iter(iterable)
+    try:
+        yield from iterator
+    except exceptions:
+        action(*args, **kwargs)
+    finally:
+        _close(iterator)
+
+
+async def _async_throwing(
+    iterator: AsyncIterator[Any],
+    exceptions: tuple[Type[Exception], ...] | Type[Exception],
+    action: Callable[..., Any],
+    args: tuple,
+    kwargs: dict,
+) -> AsyncIterator[Any]:
+    try:
+        async for item in iterator:
+            yield item
+    except exceptions:
+        action(*args, **kwargs)
+    finally:
+        await _aclose(iterator)
+
+
+def _check_leading_parameters(action: Callable[..., Any], names: tuple[str, ...]):
+    """
+    Checks that the action has the parameters the stream passes to it first.
+    """
+
+    parameters = list(signature(action).parameters)
+    if parameters[: len(names)] != list(names):
+        raise ValueError(
+            f"{action.__qualname__} must have {', '.join(map(repr, names))} "
+            + "as its first parameters."
+        )
+
+
+class _StreamingAdvice(Advice):
+    """
+    Base class of advice that wraps the iterator returned by the decorated function.
+    The iterator is wrapped lazily, so items are neither buffered nor produced ahead
+    of the consumer. Generator and async generator functions are supported.
+    """
+
+    _stream: Callable[..., Iterator[Any]]
+    _async_stream: Callable[..., AsyncIterator[Any]]
+
+    def _is_async(self):
+        return False
+
+    def _check_action_arguments(self):
+        if iscoroutinefunction(self.action):
+            raise TypeError(
+                f"{self.action.__qualname__} is a coroutine function, but the actions "
+                + f"of {type(self).__name__} are called synchronously"
+            )
+        super()._check_action_arguments()
+
+    def _stream_arguments(self, name: str, namespace: dict[str, Any]) -> list[str]:
+        namespace[name] = self.action
+        namespace[f"{name}_args"] = self.action_args
+        namespace[f"{name}_kwargs"] = self.action_kwargs
+        return [name, f"{name}_args", f"{name}_kwargs"]
+
+    def _emit(self, name, body, namespace):
+        stream = (
+            self._async_stream
+            if isasyncgenfunction(namespace["target"])
+            else self._stream
+        )
+        namespace[f"{name}_stream"] = stream
+        arguments = ", ".join(self._stream_arguments(name, namespace))
+        return body + [f"result = {name}_stream(result, {arguments})"]
+
+
+class AfterYielding(_StreamingAdvice):
+    """
+    Decorator that executes an action for every item yielded by the iterator that
+    the decorated function returns. The value returned by the action is yielded instead
+    of the item, analogously to `AfterReturning`.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    action : Callable
+        The action to be executed for every item. This action must have a parameter
+        named `_YIELDED_VAL_` at index 0.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    _leading_action_args = 1
+    _stream = staticmethod(_yielding)
+    _async_stream = staticmethod(_async_yielding)
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        _check_leading_parameters(action, ("_YIELDED_VAL_",))
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+
+
+class AfterExhausted(_StreamingAdvice):
+    """
+    Decorator that executes an action when the iterator that the decorated function
+    returns is exhausted. The action receives the number of yielded items and
+    the number of seconds elapsed since the decorated function returned.
+
+    Analogously to `AfterReturning`, the action is not executed when the iteration
+    throws an exception or the iterator is closed before it is exhausted, e.g. by
+    a `break` out of a loop over it. Exceptions are seen by `AfterThrowingInStream`.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    action : Callable
+        The action to be executed at the end of the stream. This action must have
+        parameters named `_ITEM_COUNT_` and `_ELAPSED_` at indices 0 and 1.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    _leading_action_args = 2
+    _stream = staticmethod(_exhausted)
+    _async_stream = staticmethod(_async_exhausted)
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        _check_leading_parameters(action, ("_ITEM_COUNT_", "_ELAPSED_"))
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+
+    def _stream_arguments(self, name, namespace):
+        # The time is taken when the decorated function returns, since a generator
+        # does not start executing until the first item is requested.
+        namespace["perf_counter"] = perf_counter
+        return ["perf_counter()"] + super()._stream_arguments(name, namespace)
+
+
+class AfterThrowingInStream(_StreamingAdvice):
+    """
+    Decorator that executes an action when the iterator that the decorated function
+    returns throws an exception while it is being iterated. The stream ends after the
+    action is executed, analogously to `AfterThrowing` which returns instead of raising.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    exceptions : Exception or tuple of Exceptions or None
+        The exceptions that trigger the action. If `None`, all exceptions trigger the action.
+
+    action : Callable
+        The action to be executed after the iterator throws an exception.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    _stream = staticmethod(_throwing)
+    _async_stream = staticmethod(_async_throwing)
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        exceptions: tuple[Type[Exception], ...] | Type[Exception] | None,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+        self.exceptions = exceptions or Exception
+
+    def _stream_arguments(self, name, namespace):
+        namespace[f"{name}_exceptions"] = self.exceptions
+        return [f"{name}_exceptions"] + super()._stream_arguments(name, namespace)
@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+from inspect import iscoroutinefunction
+from threading import Lock, local
+from time import monotonic
+from typing import Any, Callable
+
+from aspectpy.decorators import Advice, _indent
+
+# The `time.monotonic` time by which the current call has to finish, if any.
+_DEADLINE: ContextVar[float | None] = ContextVar("aspectpy_deadline", default=None)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+_worker = local()
+
+
+def remaining_time() -> float | None:
+    """
+    Returns the number of seconds left until the deadline of the current call set by
+    the innermost `Timeout`, or `None` if the call has no deadline. The deadline
+    propagates to the functions called by the advised function, including functions
+    executed by the worker threads of `Timeout` and tasks created in coroutines.
+    """
+
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - monotonic()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                thread_name_prefix="aspectpy-timeout",
+                initializer=setattr,
+                initargs=(_worker, "active", True),
+            )
+        return _executor
+
+
+class Timeout(Advice):
+    """
+    Decorator that bounds how long the decorated function runs. If the function does not
+    return before the deadline, the action is executed and its result is returned instead.
+
+    Synchronous functions are executed by a shared pool of worker threads, and a function
+    that misses the deadline keeps running in its worker thread, but its result
+    is discarded. A function called from a worker thread with the deadline of its
+    caller is executed in that thread directly, since the caller already enforces
+    the deadline, and only a nested `Timeout` with an earlier deadline takes another
+    worker. Coroutine functions are executed as tasks, which are cancelled when they
+    miss the deadline.
+
+    The deadline is propagated to the nested calls through a context variable. A nested
+    `Timeout` uses the earlier of its own deadline and the deadline of its caller, so the
+    remaining budget of a call shrinks as it goes deeper. See `remaining_time`.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    seconds : float
+        The number of seconds the function may run.
+
+    action : Callable
+        The fallback action executed when the deadline expires.
+
+    action_args : tuple
+        The arguments to be passed to the action.
+
+    action_kwargs : dict
+        The keyword arguments to be passed to the action.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+
+    Raises
+    ------
+    ValueError
+        If the number of seconds is not positive.
+    """
+
+    def __init__(
+        self,
+        params_update: dict[str, Any] | None,
+        seconds: float,
+        action: Callable[..., Any],
+        *action_args,
+        **action_kwargs,
+    ):
+        if seconds <= 0:
+            raise ValueError(f"seconds must be positive, got {seconds}")
+        super().__init__(params_update, action, *action_args, **action_kwargs)
+        self._check_not_detached()
+        self.seconds = seconds
+        self.expired = 0
+
+    def _deadline(self) -> float:
+        deadline = monotonic() + self.seconds
+        outer = _DEADLINE.get()
+        return deadline if outer is None or deadline < outer else outer
+
+    def _run(
+        self, inner: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> tuple[bool, Any]:
+        outer = _DEADLINE.get()
+        deadline = self._deadline()
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            self.expired += 1
+            return False, None
+
+        token = _DEADLINE.set(deadline)
+        try:
+            if deadline == outer and getattr(_worker, "active", False):
+                return True, inner(args, kwargs)
+            future = _get_executor().submit(copy_context().run, inner, args, kwargs)
+        finally:
+            _DEADLINE.reset(token)
+
+        # `future.result` with a timeout cannot tell the timeout apart from
+        # a `TimeoutError` raised by the function.
+        if not wait((future,), remaining).done:
+            future.cancel()
+            self.expired += 1
+            return False, None
+        return True, future.result()
+
+    async def _run_async(
+        self, inner: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> tuple[bool, Any]:
+        from asyncio import ensure_future, wait as wait_tasks
+
+        deadline = self._deadline()
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            self.expired += 1
+            return False, None
+
+        token = _DEADLINE.set(deadline)
+        try:
+            task = ensure_future(inner(args, kwargs))
+        finally:
+            _DEADLINE.reset(token)
+
+        try:
+            done, _ = await wait_tasks((task,), timeout=remaining)
+        except BaseException:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel()
+            self.expired += 1
+            return False, None
+        return True, task.result()
+
+    def _emit(self, name, body, namespace):
+        fallback = f"result = {self._action_call(name, namespace)}"
+        if iscoroutinefunction(namespace["target"]):
+            namespace[f"{name}_run"] = self._run_async
+            inner, await_ = f"async def {name}_inner(args, kwargs):", "await "
+        else:
+            namespace[f"{name}_run"] = self._run
+            inner, await_ = f"def {name}_inner(args, kwargs):", ""
+        # The inner advice chain runs in its own function, so it can be run by a worker.
+        return (
+            [inner]
+            + _indent(body + ["return result"])
+            + [
+                f"{name}_done, result = {await_}{name}_run({name}_inner, args, kwargs)",
+                f"if not {name}_done:",
+                f"    {fallback}",
+            ]
+        )
@@ -0,0 +1,387 @@
+from itertools import count
+from struct import Struct
+from tempfile import gettempdir
+from threading import Lock
+from time import perf_counter_ns, time_ns
+from typing import IO, Any, NamedTuple
+from weakref import WeakSet
+import atexit
+import mmap
+import os
+import stat
+
+from aspectpy.decorators import Advice, _indent
+
+MAGIC = b"ASPTRACE"
+VERSION = 1
+RETURNED = 0
+THREW = 1
+OUTCOMES = ("returned", "threw")
+
+# The header holds the magic, the version, the size of a record and the number
+# of records, and is padded to a cache line.
+HEADER = Struct("<8sIIQ")
+HEADER_SIZE = 64
+
+# A record holds the sequence number of the call plus one, so that empty slots are
+# zero, the time of the call in nanoseconds since the epoch, the duration of the call
+# in nanoseconds, the index of the qualified name in the name table and the outcome.
+RECORD = Struct("<QqQIB3x")
+
+# Logs without a path are written into a directory in the temporary directory that
+# only the user can access, so other users cannot plant links at predictable paths.
+DEFAULT_DIRECTORY = os.path.join(
+    gettempdir(), f"aspectpy-{os.getuid()}" if hasattr(os, "getuid") else "aspectpy"
+)
+DEFAULT_PATH = os.path.join(DEFAULT_DIRECTORY, "trace-{pid}.bin")
+
+# Log files that are symbolic links are not followed where the platform allows it.
+_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+# Open logs, reopened for the child process after a fork.
+_logs: WeakSet["TraceLog"] = WeakSet()
+
+
+def _private_directory(path: str):
+    """
+    Creates the directory that only the user can access, or checks that
+    the existing one is such a directory.
+    """
+
+    os.makedirs(path, 0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    status = os.lstat(path)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or status.st_mode & 0o077
+    ):
+        raise PermissionError(f"{path} is not a directory private to the user")
+
+
+def _open_file(path: str, flags: int, mode: str) -> IO[Any]:
+    """
+    Opens a log file, created if it does not exist, without following
+    a symbolic link at the path.
+    """
+
+    descriptor = os.open(path, flags | os.O_CREAT | _NOFOLLOW, 0o600)
+    if "b" in mode:
+        return os.fdopen(descriptor, mode)
+    return os.fdopen(descriptor, mode, encoding="utf-8")
+
+
+class TraceRecord(NamedTuple):
+    """
+    Record of a single traced call.
+    """
+
+    sequence: int
+    timestamp: int
+    name: str
+    duration: int
+    outcome: str
+
+
+class TraceLog:
+    """
+    Ring buffer of fixed-size binary records of calls in a memory-mapped file.
+    Recording a call only packs the record into the mapped memory, so it makes
+    no system calls. When the buffer is full, the oldest records are overwritten.
+
+    The qualified names of the traced functions are written into a name table, a text
+    file with the path of the log with `.names` appended, with a name per line,
+    when a function is woven, and the records refer to them by their index.
+
+    Every process writes its own log. The path can contain `{pid}`, which is replaced
+    by the ID of the process, and a child process created by `os.fork` starts a log
+    of its own, with the same name table. If the path does not contain `{pid}`,
+    the ID of the child is appended to it. Logs are flushed and closed at interpreter
+    exit.
+
+    Parameters
+    ----------
+    path : str or None
+        The path of the log. If `None`, `trace-{pid}.bin` in a directory in
+        the temporary directory that only the user can access is used.
+
+    capacity : int
+        The number of records kept in the ring buffer.
+
+    Raises
+    ------
+    ValueError
+        If the capacity is less than 1.
+
+    PermissionError
+        If the default directory exists, but it is not private to the user.
+    """
+
+    def __init__(self, path: str | None = None, capacity: int = 65536):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        if path is None:
+            _private_directory(DEFAULT_DIRECTORY)
+        self.path_template = path or DEFAULT_PATH
+        self.capacity = capacity
+        self.names: list[str] = []
+        self._indices: dict[str, int] = {}
+        self._lock = Lock()
+        self._open(self.path_template.format(pid=os.getpid()))
+        _logs.add(self)
+        atexit.register(self.close)
+
+    def _open(self, path: str):
+        self.path = path
+        size = HEADER_SIZE + self.capacity * RECORD.size
+        with _open_file(self.path, os.O_RDWR | os.O_TRUNC, "w+b") as file:
+            file.truncate(size)
+            self._buffer = mmap.mmap(file.fileno(), size)
+        HEADER.pack_into(self._buffer, 0, MAGIC, VERSION, RECORD.size, self.capacity)
+        self._sequence = count()
+        # Monotonic times are converted to the time since the epoch by an offset.
+        self._epoch_offset = time_ns() - perf_counter_ns()
+        with _open_file(self.path + ".names", os.O_WRONLY | os.O_TRUNC, "w") as file:
+            file.writelines(f"{name}\n" for name in self.names)
+
+    def intern(self, name: str) -> int:
+        """
+        Returns the index of the name in the name table, adding it if it is new.
+        """
+
+        with self._lock:
+            index = self._indices.get(name)
+            if index is None:
+                index = self._indices[name] = len(self.names)
+                self.names.append(name)
+                names_path = self.path + ".names"
+                with _open_file(names_path, os.O_WRONLY | os.O_APPEND, "a") as file:
+                    file.write(f"{name}\n")
+            return index
+
+    def record(self, name: int, start: int, outcome: int):
+        """
+        Records a call of the function with the name index that started at the
+        `time.perf_counter_ns` time and ends now. Calls recorded after the log
+        is closed, e.g. by threads still running at interpreter exit, are ignored.
+        """
+
+        end = perf_counter_ns()
+        sequence = next(self._sequence)
+        try:
+            RECORD.pack_into(
+                self._buffer,
+                HEADER_SIZE + sequence % self.capacity * RECORD.size,
+                sequence + 1,
+                start + self._epoch_offset,
+                end - start,
+                name,
+                outcome,
+            )
+        except (TypeError, ValueError):
+            if not self._buffer.closed:
+                raise
+
+    def flush(self):
+        """
+        Writes the mapped memory to the file.
+        """
+
+        if not self._buffer.closed:
+            self._buffer.flush()
+
+    def close(self):
+        """
+        Flushes and unmaps the log. Calls recorded after that are ignored.
+        """
+
+        if not self._buffer.closed:
+            self._buffer.flush()
+            self._buffer.close()
+
+    def _reopen(self):
+        # The child process of a fork shares the mapping of its parent,
+        # so it unmaps it and starts a log of its own.
+        self._lock = Lock()
+        if self._buffer.closed:
+            return
+        self._buffer.close()
+        path = self.path_template.format(pid=os.getpid())
+        if path == self.path:
+            path = f"{path}.{os.getpid()}"
+        self._open(path)
+
+
+def _reopen_logs():
+    for log in list(_logs):
+        log._reopen()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reopen_logs)
+
+
+_default_log: TraceLog | None = None
+_default_log_lock = Lock()
+
+
+def default_log() -> TraceLog:
+    """
+    Returns the log shared by `Trace` advice without a log of its own,
+    created with the default path and capacity when it is first needed.
+    """
+
+    global _default_log
+    with _default_log_lock:
+        if _default_log is None:
+            _default_log = TraceLog()
+        return _default_log
+
+
+class Trace(Advice):
+    """
+    Decorator that records every call of the decorated function into a `TraceLog`,
+    with the time of the call, the qualified name of the function, the duration of
+    the call, including the advice inside of the `Trace`, and whether the function
+    returned or threw an exception. Records can be read by `read_trace`.
+
+    Parameters
+    ----------
+    params_update : dict or None
+        Dictionary with key to value mappings representing new parameters.
+        If `None` or empty, the original parameters are used.
+
+    log : TraceLog or None
+        The log the calls are recorded into. If `None`, the log returned
+        by `default_log` is used.
+
+    Returns
+    -------
+    Callable
+        Wrapper function after instance of this class is called.
+    """
+
+    def __init__(
+        self, params_update: dict[str, Any] | None = None, log: TraceLog | None = None
+    ):
+        self.params_update = params_update
+        self.log = log
+
+    def _is_async(self):
+        return False
+
+    def _emit(self, name, body, namespace):
+        target = namespace["target"]
+        log = self.log or default_log()
+        namespace[f"{name}_name"] = log.intern(
+            getattr(target, "__qualname__", repr(target))
+        )
+        namespace[f"{name}_record"] = log.record
+        namespace["perf_counter_ns"] = perf_counter_ns
+        return (
+            [f"{name}_start = perf_counter_ns()", "try:"]
+            + _indent(body)
+            + [
+                "except BaseException:",
+                f"    {name}_record({name}_name, {name}_start, {THREW})",
+                "    raise",
+                f"{name}_record({name}_name, {name}_start, {RETURNED})",
+            ]
+        )
+
+
+def _read_header(data: bytes, path: str) -> int:
+    magic, version, record_size, capacity = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a trace log of version {VERSION}")
+    return capacity
+
+
+def _read_names(path: str) -> list[str]:
+    with open(path + ".names", encoding="utf-8") as file:
+        return file.read().splitlines()
+
+
+def read_trace(path: str) -> list[TraceRecord]:
+    """
+    Reads the records of a trace log, from the oldest to the newest.
+
+    Parameters
+    ----------
+    path : str
+        The path of the log, with the name table next to it.
+
+    Returns
+    -------
+    list
+        The records as `TraceRecord` tuples.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a trace log.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+    capacity = _read_header(data, path)
+    names = _read_names(path)
+    records = [
+        record
+        for record in RECORD.iter_unpack(
+            data[HEADER_SIZE : HEADER_SIZE + capacity * RECORD.size]
+        )
+        if record[0]
+    ]
+    records.sort()
+    return [
+        TraceRecord(sequence - 1, timestamp, names[name], duration, OUTCOMES[outcome])
+        for sequence, timestamp, duration, name, outcome in records
+    ]
+
+
+def read_trace_array(path: str) -> tuple[Any, list[str]]:
+    """
+    Reads the records of a trace log into a NumPy structured array, from the oldest
+    to the newest, with the `sequence`, `timestamp`, `duration`, `name` and `outcome`
+    fields. Names are indices into the returned name table, and the outcome
+    is 0 for calls that returned and 1 for calls that threw. Requires NumPy.
+
+    Parameters
+    ----------
+    path : str
+        The path of the log, with the name table next to it.
+
+    Returns
+    -------
+    tuple
+        The array and the name table.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a trace log.
+    """
+
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("reading trace logs into arrays requires NumPy") from error
+
+    dtype = numpy.dtype(
+        {
+            "names": ["sequence", "timestamp", "duration", "name", "outcome"],
+            "formats": ["<u8", "<i8", "<u8", "<u4", "u1"],
+            "offsets": [0, 8, 16, 24, 28],
+            "itemsize": RECORD.size,
+        }
+    )
+    with open(path, "rb") as file:
+        data = file.read()
+    capacity = _read_header(data, path)
+    records = numpy.frombuffer(data, dtype, capacity, HEADER_SIZE)
+    records = records[records["sequence"] != 0]
+    records = records[numpy.argsort(records["sequence"], kind="stable")]
+    records["sequence"] -= 1
+    return records, _read_names(path)
@@ -0,0 +1,736 @@
+"""
+Benchmark suite of the overhead of the advice decorators.
+
+Every case is timed with `timeit` and compared to the unadvised call of the same
+signature shape. Run from the `src` folder:
+
+    python benchmark.py                         # print a table
+    python benchmark.py --json results.json     # also write machine-readable results
+    python benchmark.py --compare results.json  # fail on regressions against a baseline
+    python benchmark.py --memory                # also measure bytes per advised function
+"""
+
+from argparse import ArgumentParser
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from inspect import signature
+from timeit import repeat
+from typing import Any, Callable, ContextManager, Iterator, NamedTuple, TextIO
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import tracemalloc
+from aspectpy.batching import AfterReturningBatch, Batching
+from aspectpy.bulkhead import Bulkhead, BulkheadLimits
+from aspectpy.decorators import (
+    Before,
+    AfterReturning,
+    AfterThrowing,
+    Around,
+    mutate_params,
+    static_proceed,
+    validate_after_returning_action,
+)
+from aspectpy.pointcut import Pointcuts
+from aspectpy.profiling import Timed
+from aspectpy.offload import Offload, OffloadPool
+from aspectpy.resilience import CircuitBreaker, Retry
+from aspectpy.singleflight import SingleFlight
+from aspectpy.sampling import EveryN
+from aspectpy.timeout import Timeout
+from aspectpy.tracing import Trace, TraceLog
+
+NUMBER = 100_000
+REPEAT = 5
+
+
+def action(num: int, text: str | None = None):
+    return num
+
+
+@validate_after_returning_action
+def action_after_returning(_RETURNED_VAL_: Any, num: int):
+    return _RETURNED_VAL_
+
+
+@static_proceed
+def proceed(func: Callable[..., Any]) -> bool:
+    return True
+
+
+def join_point_action(num: int, _JOIN_POINT_: Any):
+    return num
+
+
+def sink(_RETURNED_BATCH_: Any):
+    return len(_RETURNED_BATCH_)
+
+
+@EveryN(100).sample
+def sampled_action(num: int, text: str | None = None):
+    return num
+
+
+def target(a, b, c=3, *args, d=4, **kwargs):
+    return a
+
+
+# Signature shapes of the advised functions. Every shape has a target that returns,
+# a target that raises, a call of a target with typical arguments and a parameter
+# update of a parameter that is passed in that call.
+
+
+def positional(a, b, c):
+    return a
+
+
+def positional_raising(a, b, c):
+    raise ValueError(a)
+
+
+def keyword(*, a, b, c):
+    return a
+
+
+def keyword_raising(*, a, b, c):
+    raise ValueError(a)
+
+
+def defaults(a, b=2, c=3):
+    return a
+
+
+def defaults_raising(a, b=2, c=3):
+    raise ValueError(a)
+
+
+def varargs(a, *args, **kwargs):
+    return a
+
+
+def varargs_raising(a, *args, **kwargs):
+    raise ValueError(a)
+
+
+class Shape(NamedTuple):
+    target: Callable[..., Any]
+    raising: Callable[..., Any]
+    call: Callable[[Callable[..., Any]], Callable[[], Any]]
+    params_update: dict[str, Any]
+
+
+SHAPES = {
+    "positional": Shape(
+        positional, positional_raising, lambda f: lambda: f(1, 2, 3), {"b": 20}
+    ),
+    "keyword": Shape(
+        keyword, keyword_raising, lambda f: lambda: f(a=1, b=2, c=3), {"b": 20}
+    ),
+    "defaults": Shape(defaults, defaults_raising, lambda f: lambda: f(1), {"c": 30}),
+    "varargs": Shape(
+        varargs, varargs_raising, lambda f: lambda: f(1, 2, 3, x=4), {"a": 10}
+    ),
+}
+
+
+def catching(call: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Returns a call that catches the `ValueError` of a raising target, used as the
+    unadvised reference point of the raising path of `AfterThrowing`.
+    """
+
+    def caught():
+        try:
+            return call()
+        except ValueError:
+            return None
+
+    return caught
+
+
+ADVICE: dict[str, Callable[[dict[str, Any] | None], Any]] = {
+    "Before": lambda update: Before(update, action, 1, text="before"),
+    "AfterReturning": lambda update: AfterReturning(update, action_after_returning, 2),
+    "AfterThrowing": lambda update: AfterThrowing(update, ValueError, action, 3),
+    "Around (proceed)": lambda update: Around(update, True, action, 4),
+    "Around (short-circuit)": lambda update: Around(update, False, action, 4),
+}
+
+
+class Case(NamedTuple):
+    call: Callable[[], Any] | None
+    baseline: str | None
+    # Context manager factory of the call of a case that needs threads or files,
+    # which are only created when the case is measured and released afterwards.
+    setup: Callable[[], ContextManager[Callable[[], Any]]] | None = None
+
+
+def shape_cases() -> dict[str, Case]:
+    """
+    Returns the cases of every advice type with every signature shape,
+    with and without a parameter update.
+    """
+
+    cases: dict[str, Case] = {}
+    for shape_name, shape in SHAPES.items():
+        raw = f"raw / {shape_name}"
+        raw_raising = f"raw (raising) / {shape_name}"
+        cases[raw] = Case(shape.call(shape.target), None)
+        cases[raw_raising] = Case(catching(shape.call(shape.raising)), None)
+        for update_name, update in (("", None), (" + params_update", shape.params_update)):
+            for advice_name, make in ADVICE.items():
+                cases[f"{advice_name}{update_name} / {shape_name}"] = Case(
+                    shape.call(make(update)(shape.target)), raw
+                )
+            cases[f"AfterThrowing (raising){update_name} / {shape_name}"] = Case(
+                shape.call(ADVICE["AfterThrowing"](update)(shape.raising)), raw_raising
+            )
+    return cases
+
+
+def per_call_signature_before(params_update: dict[str, Any] | None):
+    """
+    Reimplementation of the `Before` wrapper which calls `signature` and
+    `mutate_params` on every call, used as a reference point.
+    """
+
+    def decorator(func: Callable[..., Any]):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            args, kwargs = mutate_params(args, kwargs, params_update, signature(func))
+            action(1, text="before")
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def stacked(count: int) -> Callable[..., Any]:
+    """
+    Returns `target` advised with `count` stacked decorators.
+    """
+
+    advice = [
+        Before({"b": 20}, action, 1),
+        AfterReturning({"d": 50}, action_after_returning, 2),
+        AfterThrowing(None, ValueError, action, 3),
+        Around(None, True, action, 4),
+    ]
+    func = target
+    for item in advice[:count]:
+        func = item(func)
+    return func
+
+
+def call_target(func: Callable[..., Any]) -> Callable[[], Any]:
+    return lambda: func(1, 2, d=5)
+
+
+@contextmanager
+def offloaded() -> Iterator[Callable[[], Any]]:
+    pool = OffloadPool(1, processes=False)
+    try:
+        yield call_target(Offload(None, pool)(target))
+    finally:
+        pool.shutdown()
+
+
+@contextmanager
+def traced() -> Iterator[Callable[[], Any]]:
+    with tempfile.TemporaryDirectory(prefix="aspectpy-benchmark-") as directory:
+        log = TraceLog(os.path.join(directory, "trace-{pid}.bin"))
+        try:
+            yield call_target(Trace(None, log)(target))
+        finally:
+            log.close()
+
+
+@contextmanager
+def batched() -> Iterator[Callable[[], Any]]:
+    batch = AfterReturningBatch(None, Batching(size=4096), sink)
+    try:
+        yield call_target(batch(target))
+    finally:
+        # Stops the background thread after delivering the pending values.
+        batch._close()
+
+
+def reference_cases() -> dict[str, Case]:
+    """
+    Returns the cases of `target` with a mix of parameters, stacked advice,
+    the other advice types and the reimplementation of the original wrapper.
+    """
+
+    call = call_target
+
+    raw = "raw / target"
+    cases = {
+        raw: Case(call(target), None),
+        "Before (per-call signature) / target": Case(
+            call(per_call_signature_before(None)(target)), raw
+        ),
+        "Before + params_update (per-call signature) / target": Case(
+            call(per_call_signature_before({"b": 20, "d": 50})(target)), raw
+        ),
+        "Around + static proceed / target": Case(
+            call(Around(None, proceed, action, 4)(target)), raw
+        ),
+        "Before, sampled 1 in 100 / target": Case(
+            call(Before(None, sampled_action, 1, text="before")(target)), raw
+        ),
+        "Before with join point / target": Case(
+            call(Before(None, join_point_action, 1)(target)), raw
+        ),
+        "Timed / target": Case(call(Timed()(target)), raw),
+        "Retry / target": Case(call(Retry()(target)), raw),
+        "Bulkhead / target": Case(
+            call(Bulkhead(None, BulkheadLimits(8), action, 5)(target)), raw
+        ),
+        "Offload (threads) / target": Case(None, raw, offloaded),
+        "SingleFlight / target": Case(call(SingleFlight()(target)), raw),
+        "Trace / target": Case(None, raw, traced),
+        "Timeout / target": Case(call(Timeout(None, 1.0, action, 5)(target)), raw),
+        "CircuitBreaker (closed) / target": Case(call(CircuitBreaker()(target)), raw),
+        "AfterReturningBatch / target": Case(None, raw, batched),
+    }
+    for count in range(1, 5):
+        cases[f"{count} stacked advice / target"] = Case(call(stacked(count)), raw)
+    return cases
+
+
+def method_cases() -> dict[str, Case]:
+    """
+    Returns the cases of methods of every kind woven by the metaclass of `Pointcuts`
+    against an unadvised class.
+    """
+
+    class Plain:
+        def handle(self, a, b=2):
+            return a
+
+        @staticmethod
+        def static(a, b=2):
+            return a
+
+        @classmethod
+        def klass(cls, a, b=2):
+            return a
+
+        @property
+        def value(self):
+            return 1
+
+    pointcuts = (
+        Pointcuts()
+        .add(r"^(handle|static|klass|value)$", Before(None, action, 1))
+        .add(r"^update_handle$", Before({"b": 20}, action, 1))
+    )
+
+    class Woven(Plain, metaclass=pointcuts.metaclass()):
+        handle = Plain.handle
+        static = Plain.__dict__["static"]
+        klass = Plain.__dict__["klass"]
+        value = Plain.__dict__["value"]
+        update_handle = Plain.handle
+
+    plain, woven = Plain(), Woven()
+    cases: dict[str, Case] = {}
+    calls = {
+        "method": lambda obj: lambda: obj.handle(1, 2),
+        "static method": lambda obj: lambda: obj.static(1, 2),
+        "class method": lambda obj: lambda: obj.klass(1, 2),
+        "property": lambda obj: lambda: obj.value,
+    }
+    for kind, call in calls.items():
+        raw = f"raw / {kind}"
+        cases[raw] = Case(call(plain), None)
+        cases[f"Before (metaclass) / {kind}"] = Case(call(woven), raw)
+    cases["Before + params_update (metaclass) / method"] = Case(
+        lambda: woven.update_handle(1, 2), "raw / method"
+    )
+    cases.update(super_call_cases())
+    return cases
+
+
+def super_call_cases() -> dict[str, Case]:
+    """
+    Returns the cases of an overriding method calling the method it overrides
+    through `super()`, with both methods woven, with and without skipping the advice
+    of the calls through `super()`.
+    """
+
+    class Base:
+        def handle(self, a, b=2):
+            return a
+
+    class Derived(Base):
+        def handle(self, a, b=2):
+            return super().handle(a, b)
+
+    class Deep(Derived):
+        def handle(self, a, b=2):
+            return super().handle(a, b)
+
+    class Deeper(Deep):
+        def handle(self, a, b=2):
+            return super().handle(a, b)
+
+    def woven_hierarchy(skip_super: bool, depth: int) -> Any:
+        pointcuts = Pointcuts(skip_super=skip_super).add(
+            r"^handle$", Before(None, action, 1)
+        )
+
+        class WovenBase(metaclass=pointcuts.metaclass()):
+            handle = Base.handle
+
+        cls = WovenBase
+        for _ in range(depth - 1):
+
+            class WovenDerived(cls):
+                def handle(self, a, b=2):
+                    return super().handle(a, b)
+
+            cls = WovenDerived
+        return cls()
+
+    plain, deep = Derived(), Deeper()
+    cases = {
+        "raw / super() call": Case(lambda: plain.handle(1, 2), None),
+        "raw / 4-level super() call": Case(lambda: deep.handle(1, 2), None),
+    }
+    for label, depth, reference in [
+        ("super() call", 2, "raw / super() call"),
+        ("4-level super() call", 4, "raw / 4-level super() call"),
+    ]:
+        woven, skipping = woven_hierarchy(False, depth), woven_hierarchy(True, depth)
+        cases[f"Before (metaclass) / {label}"] = Case(
+            lambda woven=woven: woven.handle(1, 2), reference
+        )
+        cases[f"Before (metaclass, skip_super) / {label}"] = Case(
+            lambda skipping=skipping: skipping.handle(1, 2), reference
+        )
+    return cases
+
+
+def all_cases() -> dict[str, Case]:
+    return {**shape_cases(), **reference_cases(), **method_cases()}
+
+
+def measure(call: Callable[[], Any], number: int = NUMBER, repeat_: int = REPEAT) -> float:
+    """
+    Returns the best time of a single call in nanoseconds.
+    """
+
+    best = min(repeat(call, number=number, repeat=repeat_))
+    return best / number * 1e9
+
+
+METHODS = 1000
+POINTCUTS = 20
+FUNCTIONS = 2000
+
+
+def make_function() -> Callable[..., Any]:
+    # Every call creates a new function object sharing the same code, like the methods
+    # of many classes created from the same source.
+    def handle(a, b=2):
+        return a
+
+    return handle
+
+
+def memory_cases() -> dict[str, Case]:
+    """
+    Returns the cases of the memory allocated per advised function, where `call` advises
+    a new function. Advice created per function is what decorating every function
+    with its own `@Before(...)` does, while shared advice is what pointcuts do.
+    """
+
+    shared = Before(None, action, 1)
+    shared_stack = (Before(None, action, 1), AfterReturning(None, action_after_returning, 1))
+
+    def stacked(func: Callable[..., Any], advice: tuple[Any, ...]) -> Callable[..., Any]:
+        for item in advice:
+            func = item(func)
+        return func
+
+    return {
+        "raw / function": Case(lambda func: func, None),
+        "Before (per function) / function": Case(
+            lambda func: Before(None, action, 1)(func), "raw / function"
+        ),
+        "Before (shared) / function": Case(shared, "raw / function"),
+        "Before + AfterReturning (per function) / function": Case(
+            lambda func: stacked(
+                func,
+                (Before(None, action, 1), AfterReturning(None, action_after_returning, 1)),
+            ),
+            "raw / function",
+        ),
+        "Before + AfterReturning (shared) / function": Case(
+            lambda func: stacked(func, shared_stack), "raw / function"
+        ),
+        "Around + params_update (per function) / function": Case(
+            lambda func: Around({"b": 20}, proceed, action, 1)(func), "raw / function"
+        ),
+    }
+
+
+def measure_memory(advise: Callable[..., Any], count: int = FUNCTIONS) -> float:
+    """
+    Returns the number of bytes allocated per function by creating and advising
+    `count` functions, which are kept alive until the end of the measurement.
+    """
+
+    # The first advised function compiles and caches the shared code of the wrapper.
+    advise(make_function())
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        functions = [advise(make_function()) for _ in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del functions
+    return allocated / count
+
+
+def run_memory(
+    cases: dict[str, Case], count: int, pattern: str | None
+) -> dict[str, dict[str, Any]]:
+    """
+    Measures the memory of the cases whose names match the pattern,
+    together with their baselines.
+    """
+
+    selected = {
+        name
+        for name in cases
+        if pattern is None or re.search(pattern, name) is not None
+    }
+    selected |= {cases[name].baseline for name in selected if cases[name].baseline}
+
+    results: dict[str, dict[str, Any]] = {}
+    for name, case in cases.items():
+        if name not in selected:
+            continue
+        size = measure_memory(case.call, count)
+        results[name] = {"bytes": size, "baseline": case.baseline, "overhead_bytes": None}
+        if case.baseline is not None:
+            results[name]["overhead_bytes"] = size - results[case.baseline]["bytes"]
+    return results
+
+
+def method(self):
+    return self
+
+
+def pointcut_patterns() -> list[str]:
+    """
+    Returns exact-name, prefix and general regular expression pointcuts.
+    """
+
+    patterns = []
+    for index in range(POINTCUTS):
+        if index % 3 == 0:
+            patterns.append(rf"^method_{index * 7}$")
+        elif index % 3 == 1:
+            patterns.append(rf"^handler_{index}")
+        else:
+            patterns.append(rf"^method_{index}[0-9]$")
+    return patterns
+
+
+def per_attribute_matching(namespace: dict[str, Any]) -> dict[str, Any]:
+    """
+    Weaves the namespace by matching every pointcut against every attribute,
+    like the example `Aspect` metaclass, used as a reference point.
+    """
+
+    regexps = [re.compile(pattern) for pattern in pointcut_patterns()]
+    advice = Before(None, action, 1)
+    for attr_name, attr_value in namespace.items():
+        if not callable(attr_value):
+            continue
+        for regexp in regexps:
+            if regexp.match(attr_name):
+                attr_value = advice(attr_value)
+        namespace[attr_name] = attr_value
+    return namespace
+
+
+def compiled_pointcuts() -> Pointcuts:
+    pointcuts = Pointcuts()
+    advice = Before(None, action, 1)
+    for pattern in pointcut_patterns():
+        pointcuts.add(pattern, advice)
+    return pointcuts
+
+
+def class_creation_cases() -> dict[str, Case]:
+    """
+    Returns the cases of creating a class with `METHODS` methods
+    woven by `POINTCUTS` pointcuts.
+    """
+
+    def namespace() -> dict[str, Any]:
+        return {f"method_{index}": method for index in range(METHODS)}
+
+    warm = compiled_pointcuts()
+    return {
+        "per-attribute matching / class creation": Case(
+            lambda: type("Woven", (), per_attribute_matching(namespace())), None
+        ),
+        "Pointcuts (cold) / class creation": Case(
+            lambda: type("Woven", (), compiled_pointcuts().weave_namespace(namespace())),
+            None,
+        ),
+        "Pointcuts (cached names) / class creation": Case(
+            lambda: type("Woven", (), warm.weave_namespace(namespace())), None
+        ),
+    }
+
+
+def run(
+    cases: dict[str, Case], number: int, repeat_: int, pattern: str | None
+) -> dict[str, dict[str, Any]]:
+    """
+    Measures the cases whose names match the pattern, together with their baselines.
+    Class creation is measured with a thousandth of the calls.
+    """
+
+    selected = {
+        name
+        for name in cases
+        if pattern is None or re.search(pattern, name) is not None
+    }
+    selected |= {cases[name].baseline for name in selected if cases[name].baseline}
+
+    results: dict[str, dict[str, Any]] = {}
+    for name, case in cases.items():
+        if name not in selected:
+            continue
+        calls = max(number // 1000, 1) if name.endswith("class creation") else number
+        with ExitStack() as stack:
+            call = case.call if case.setup is None else stack.enter_context(case.setup())
+            elapsed = measure(call, calls, repeat_)
+        results[name] = {"ns": elapsed, "baseline": case.baseline, "overhead_ns": None}
+        if case.baseline is not None:
+            results[name]["overhead_ns"] = elapsed - results[case.baseline]["ns"]
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+    min_delta: float,
+    out: TextIO = sys.stdout,
+) -> list[str]:
+    """
+    Prints the change of every case measured in both runs and returns the names
+    of the cases that are slower than in the baseline by more than the relative
+    threshold and by more than `min_delta` nanoseconds.
+    """
+
+    regressions = []
+    print(f"{'case':<60}{'old ns':>12}{'new ns':>12}{'change':>9}", file=out)
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["ns"], result["ns"]
+        change = new / old - 1 if old else 0.0
+        regressed = change > threshold and new - old > min_delta
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<60}{old:>12.1f}{new:>12.1f}{change:>+9.1%}"
+            + ("  REGRESSION" if regressed else ""),
+            file=out,
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = ArgumentParser(description="Benchmarks the overhead of the advice decorators.")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON, - for stdout")
+    parser.add_argument("--compare", metavar="PATH", help="JSON results of a baseline run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression (default: 0.10)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=20.0,
+        help="slowdown in ns below which nothing is a regression (default: 20)",
+    )
+    parser.add_argument("--filter", metavar="REGEX", help="only run the matching cases")
+    parser.add_argument("--number", type=int, default=NUMBER, help="calls per repetition")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="repetitions per case")
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="also measure the bytes allocated per advised function",
+    )
+    args = parser.parse_args(argv)
+
+    cases = {**all_cases(), **class_creation_cases()}
+    results = run(cases, args.number, args.repeat, args.filter)
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "number": args.number,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.memory:
+        report["memory"] = run_memory(memory_cases(), FUNCTIONS, args.filter)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'case':<60}{'ns/call':>12}{'overhead':>12}")
+        for name, result in results.items():
+            overhead = result["overhead_ns"]
+            print(
+                f"{name:<60}{result['ns']:>12.1f}"
+                + (f"{overhead:>12.1f}" if overhead is not None else f"{'':>12}")
+            )
+        if args.memory:
+            print(f"\n{'case':<60}{'bytes/func':>12}{'overhead':>12}")
+            for name, result in report["memory"].items():
+                overhead = result["overhead_bytes"]
+                print(
+                    f"{name:<60}{result['bytes']:>12.0f}"
+                    + (f"{overhead:>12.0f}" if overhead is not None else f"{'':>12}")
+                )
+        if args.json is not None:
+            with open(args.json, "w") as file:
+                json.dump(report, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        # The comparison does not mix with JSON written to stdout.
+        out = sys.stderr if args.json == "-" else sys.stdout
+        print(file=out)
+        regressions = compare(results, baseline, args.threshold, args.min_delta, out)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}", file=out)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
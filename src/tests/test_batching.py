@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from aspectpy.batching import AfterReturningBatch, Batching
+
+
+class Sink:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches: list[tuple[float, list]] = []
+        self.delivered = threading.Event()
+
+    def __call__(self, _RETURNED_BATCH_):
+        self.batches.append((time.monotonic(), list(_RETURNED_BATCH_)))
+        self.delivered.set()
+        time.sleep(self.delay)
+
+
+def test_full_batches_are_delivered_in_the_background():
+    sink = Sink()
+    batch = AfterReturningBatch(None, Batching(size=3, interval=60.0), sink)
+
+    @batch
+    def func(x):
+        return x
+
+    assert [func(x) for x in range(4)] == [0, 1, 2, 3]
+    assert sink.delivered.wait(5)
+    assert [values for _, values in sink.batches] == [[0, 1, 2]]
+    assert batch.pending == 1
+    batch.flush()
+    assert [values for _, values in sink.batches] == [[0, 1, 2], [3]]
+
+
+def test_interval_counts_from_the_oldest_value():
+    interval = 0.5
+    sink = Sink(delay=interval)
+    batch = AfterReturningBatch(None, Batching(size=2, interval=interval), sink)
+
+    @batch
+    def func(x):
+        return x
+
+    func(0)
+    func(1)
+    assert sink.delivered.wait(5)
+    sink.delivered.clear()
+    # The value waits for the slow delivery of the full batch, but not for another
+    # interval after it.
+    added = time.monotonic()
+    func(2)
+    assert sink.delivered.wait(5)
+    delivered, values = sink.batches[-1]
+    assert values == [2]
+    assert delivered - added < interval + 0.3
+    batch._close()
+
+
+def test_values_returned_after_close_are_delivered_right_away():
+    sink = Sink()
+    batch = AfterReturningBatch(None, Batching(size=10, interval=60.0), sink)
+
+    @batch
+    def func(x):
+        return x
+
+    func(0)
+    batch._close()
+    assert [values for _, values in sink.batches] == [[0]]
+    assert func(1) == 1
+    assert [values for _, values in sink.batches] == [[0], [1]]
+    assert batch.pending == 0
+
+
+def test_values_are_collected_into_arrays():
+    numpy = pytest.importorskip("numpy")
+    batches = []
+
+    def sink(_RETURNED_BATCH_):
+        batches.append(_RETURNED_BATCH_)
+
+    batch = AfterReturningBatch(None, Batching(size=2, dtype=numpy.float64), sink)
+
+    @batch
+    def func(x):
+        return x * 1.5
+
+    func(1)
+    func(2)
+    func(3)
+    batch.flush()
+    assert all(isinstance(item, numpy.ndarray) for item in batches)
+    assert [item.tolist() for item in batches] == [[1.5, 3.0], [4.5]]
+    batch._close()
@@ -0,0 +1,28 @@
+from threading import Event, Thread
+
+from aspectpy.bulkhead import Bulkhead, BulkheadLimits
+from aspectpy.decorators import Before
+
+
+def test_limit_is_kept_when_more_advice_is_applied():
+    entered, release = Event(), Event()
+    bulkhead = Bulkhead(None, BulkheadLimits(1), lambda: "rejected")
+
+    @bulkhead
+    def func():
+        entered.set()
+        release.wait()
+        return "func"
+
+    thread = Thread(target=func)
+    thread.start()
+    entered.wait()
+    func = Before(None, lambda: None)(func)
+    try:
+        assert func() == "rejected"
+    finally:
+        release.set()
+        thread.join()
+    assert func() == "func"
+    (compartment,) = bulkhead.compartments.values()
+    assert (compartment.admitted, compartment.rejected) == (2, 1)
@@ -0,0 +1,37 @@
+from aspectpy.cache import Cached
+from aspectpy.decorators import Before
+
+
+def test_cache_is_kept_when_more_advice_is_applied():
+    calls = []
+    cached = Cached(None)
+
+    @cached
+    def func(x):
+        calls.append(x)
+        return x
+
+    func(1)
+    func(1)
+    func = Before(None, calls.append, "before")(func)
+    assert func(1) == 1
+    assert calls == [1, "before"]
+    assert cached.info().hits == 2
+    (cache,) = cached.caches.values()
+    assert cache.info().hits == 2
+
+
+def test_functions_with_the_same_name_get_their_own_caches():
+    cached = Cached(None)
+
+    def make(value):
+        @cached
+        def func():
+            return value
+
+        return func
+
+    first, second = make(1), make(2)
+    assert (first(), second(), first(), second()) == (1, 2, 1, 2)
+    assert cached.info().hits == 2
+    assert cached.info().size == 2
@@ -0,0 +1,506 @@
+import asyncio
+import traceback
+from typing import Any
+
+import pytest
+
+from aspectpy.decorators import (
+    Advice,
+    AfterReturning,
+    AfterThrowing,
+    Around,
+    Before,
+    concurrent_action,
+    dynamic_proceed,
+    invalidate_proceed,
+    static_proceed,
+    validate_after_returning_action,
+)
+
+
+def recorder(calls: list[Any]):
+    def record(*args, **kwargs):
+        calls.append((args, kwargs) if kwargs else args)
+
+    return record
+
+
+def returned_recorder(calls: list[Any]):
+    @validate_after_returning_action
+    def record(_RETURNED_VAL_: Any, label: str):
+        calls.append((label, _RETURNED_VAL_))
+        return _RETURNED_VAL_
+
+    return record
+
+
+def test_advice_is_abstract():
+    with pytest.raises(TypeError):
+        Advice(None, print)
+
+
+def test_nested_advice_runs_in_the_order_of_nested_wrappers():
+    calls: list[Any] = []
+    before = recorder(calls)
+    after = returned_recorder(calls)
+
+    @Before(None, before, "outer")
+    @AfterReturning(None, after, "middle")
+    @Before(None, before, "inner")
+    def func(x):
+        calls.append(("func", x))
+        return x
+
+    assert func(1) == 1
+    assert calls == [("outer",), ("inner",), ("func", 1), ("middle", 1)]
+
+
+def test_nested_after_returning_passes_results_outwards():
+    calls: list[Any] = []
+
+    @validate_after_returning_action
+    def double(_RETURNED_VAL_: int, label: str):
+        calls.append((label, _RETURNED_VAL_))
+        return _RETURNED_VAL_ * 2
+
+    @AfterReturning(None, double, "outer")
+    @AfterReturning(None, double, "inner")
+    def func(x):
+        return x
+
+    assert func(3) == 12
+    assert calls == [("inner", 3), ("outer", 6)]
+
+
+def test_outer_after_throwing_handles_errors_of_inner_advice():
+    calls: list[Any] = []
+    record = recorder(calls)
+
+    def fail():
+        raise KeyError("action")
+
+    @AfterThrowing(None, KeyError, record, "outer")
+    @Before(None, fail)
+    def func():
+        calls.append("func")
+
+    assert func() is None
+    assert calls == [("outer",)]
+
+
+def test_inner_after_throwing_handles_the_error_first():
+    calls: list[Any] = []
+    record = recorder(calls)
+
+    @AfterThrowing(None, ValueError, record, "outer")
+    @AfterThrowing(None, ValueError, lambda: "handled")
+    def func():
+        raise ValueError("func")
+
+    assert func() == "handled"
+    assert calls == []
+
+
+def test_weaving_the_same_advice_twice_is_idempotent():
+    calls: list[Any] = []
+    advice = Before(None, recorder(calls), "a")
+
+    @advice
+    @advice
+    def func():
+        pass
+
+    func()
+    assert calls == [("a",)]
+
+
+def test_stacked_identical_advice_runs_once_per_application():
+    calls: list[Any] = []
+    record = recorder(calls)
+
+    @Before(None, record, "a")
+    @Before(None, record, "a")
+    def func():
+        calls.append("func")
+
+    func()
+    assert calls == [("a",), ("a",), "func"]
+
+
+def test_advising_a_bound_method_of_an_advised_method_wraps_it():
+    calls: list[Any] = []
+    record = recorder(calls)
+
+    class C:
+        @Before(None, record, "x")
+        def m(self):
+            return "ok"
+
+    advised = Before(None, record, "y")(C().m)
+    assert advised() == "ok"
+    assert calls == [("y",), ("x",)]
+
+
+def test_equal_action_arguments_are_not_swapped():
+    calls: list[Any] = []
+    record = recorder(calls)
+
+    @Before(None, record, (1, 2))
+    def first():
+        pass
+
+    @Before(None, record, (True, 2.0))
+    def second():
+        pass
+
+    first()
+    second()
+    assert calls == [((1, 2),), ((True, 2.0),)]
+    assert type(calls[1][0][0]) is bool
+
+
+@pytest.mark.parametrize("values", [((1,), (1.0,)), (0.0, -0.0), (1, True)])
+def test_equal_updated_values_are_not_swapped(values):
+    functions = []
+    for value in values:
+
+        @Before({"x": value}, lambda: None)
+        def func(x):
+            return x
+
+        functions.append(func)
+
+    for func, value in zip(functions, values):
+        assert repr(func(None)) == repr(value)
+
+
+def test_params_update_replaces_positional_and_keyword_arguments():
+    @Before({"x": 10, "y": 20}, lambda: None)
+    def func(x, y=2, z=3):
+        return x, y, z
+
+    assert func(1) == (10, 20, 3)
+    assert func(1, y=5) == (10, 20, 3)
+    assert func(x=1, y=5, z=6) == (10, 20, 6)
+
+
+def test_params_update_of_inner_advice_takes_precedence():
+    @Before({"x": "outer", "y": "outer"}, lambda: None)
+    @Before({"x": "inner"}, lambda: None)
+    def func(x, y):
+        return x, y
+
+    assert func(1, 2) == ("inner", "outer")
+    assert func(x=1, y=2) == ("inner", "outer")
+
+
+def test_around_calls_the_action_instead_of_the_function():
+    calls: list[Any] = []
+
+    @Around(None, False, lambda value: value, "fallback")
+    def func():
+        calls.append("func")
+        return "func"
+
+    assert func() == "fallback"
+    assert calls == []
+
+
+def test_around_proceeds_only_when_the_condition_is_true():
+    results = iter([True, 1, False, None])
+
+    @Around(None, lambda target: next(results), lambda: "fallback")
+    def func():
+        return "func"
+
+    assert [func() for _ in range(4)] == ["func", "fallback", "fallback", "fallback"]
+
+
+def test_around_passes_the_target_to_the_proceed_condition():
+    seen: list[Any] = []
+
+    def proceed(target):
+        seen.append(target)
+        return True
+
+    def func():
+        return "func"
+
+    advised = Around(None, proceed, lambda: "fallback")(func)
+    assert advised() == "func"
+    assert seen == [func]
+
+
+def test_around_caches_static_proceed_decisions():
+    evaluated: list[Any] = []
+
+    @static_proceed
+    def proceed(target):
+        evaluated.append(target)
+        return len(evaluated) > 1
+
+    @Around(None, proceed, lambda: "fallback")
+    def func():
+        return "func"
+
+    assert [func(), func()] == ["fallback", "fallback"]
+    invalidate_proceed(func)
+    assert func() == "func"
+    assert len(evaluated) == 2
+
+
+def test_around_passes_arguments_to_dynamic_proceed():
+    @dynamic_proceed
+    def proceed(target, args, kwargs):
+        return args[0] > 0
+
+    @Around({"y": 1}, proceed, lambda: "fallback")
+    def func(x, y=0):
+        return x + y
+
+    assert func(1) == 2
+    assert func(-1) == "fallback"
+
+
+def test_fallback_result_is_seen_by_outer_after_returning():
+    calls: list[Any] = []
+
+    @AfterReturning(None, returned_recorder(calls), "after")
+    @Around(None, False, lambda: "fallback")
+    def func():
+        return "func"
+
+    assert func() == "fallback"
+    assert calls == [("after", "fallback")]
+
+
+def test_tracebacks_show_the_source_of_the_wrappers():
+    def fail():
+        raise ValueError("failed")
+
+    def wrapper_frames(func):
+        with pytest.raises(ValueError) as info:
+            func()
+        return [
+            frame
+            for frame in traceback.extract_tb(info.tb)
+            if frame.filename.startswith("<aspectpy chain ")
+        ]
+
+    (before,) = wrapper_frames(Before(None, lambda: None)(fail))
+    assert before.line == "result = target(*args, **kwargs)"
+    (around,) = wrapper_frames(Around(None, True, lambda: None)(fail))
+    assert around.filename != before.filename
+
+
+def test_async_before_awaits_coroutine_actions_before_the_function():
+    calls: list[Any] = []
+
+    async def action(label):
+        await asyncio.sleep(0)
+        calls.append(label)
+
+    @Before(None, recorder(calls), "sync")
+    @Before(None, action, "async")
+    async def func(x):
+        calls.append(x)
+        return x
+
+    assert asyncio.run(func(1)) == 1
+    assert calls == [("sync",), "async", 1]
+
+
+def test_async_after_returning_receives_the_awaited_value():
+    calls: list[Any] = []
+
+    @validate_after_returning_action
+    async def action(_RETURNED_VAL_, label):
+        await asyncio.sleep(0)
+        calls.append((label, _RETURNED_VAL_))
+        return _RETURNED_VAL_ * 2
+
+    @AfterReturning(None, action, "after")
+    async def func(x):
+        return x + 1
+
+    assert asyncio.run(func(1)) == 4
+    assert calls == [("after", 2)]
+
+
+def test_async_after_throwing_handles_errors_raised_in_the_coroutine():
+    async def action(label):
+        await asyncio.sleep(0)
+        return label
+
+    @AfterThrowing(None, ValueError, action, "handled")
+    async def func(error):
+        await asyncio.sleep(0)
+        raise error
+
+    assert asyncio.run(func(ValueError())) == "handled"
+    with pytest.raises(KeyError):
+        asyncio.run(func(KeyError()))
+
+
+def test_async_around_awaits_the_proceed_condition_and_the_action():
+    @dynamic_proceed
+    async def proceed(func, args, kwargs):
+        await asyncio.sleep(0)
+        return args[0] > 0
+
+    async def action():
+        await asyncio.sleep(0)
+        return "fallback"
+
+    @Around(None, proceed, action)
+    async def func(x):
+        return x
+
+    assert asyncio.run(func(1)) == 1
+    assert asyncio.run(func(-1)) == "fallback"
+
+
+def test_async_advice_applies_params_update():
+    calls: list[Any] = []
+
+    async def action(label):
+        calls.append(label)
+
+    @Before({"y": 10}, action, "before")
+    @AfterReturning({"x": 1}, returned_recorder(calls), "after")
+    async def func(x, y=0):
+        return x + y
+
+    assert asyncio.run(func(5)) == 11
+    assert asyncio.run(func(5, y=20)) == 11
+    assert calls == ["before", ("after", 11)] * 2
+
+
+def test_concurrent_before_actions_are_gathered():
+    events: list[Any] = []
+
+    @concurrent_action
+    async def action(label):
+        events.append(("start", label))
+        await asyncio.sleep(0)
+        events.append(("end", label))
+
+    @Before(None, action, "first")
+    @Before(None, action, "second")
+    async def func():
+        return "done"
+
+    assert asyncio.run(func()) == "done"
+    assert events[:2] == [("start", "first"), ("start", "second")]
+
+
+def test_coroutine_actions_cannot_advise_regular_functions():
+    async def action():
+        pass
+
+    with pytest.raises(TypeError):
+
+        @Before(None, action)
+        def func():
+            pass
+
+
+def test_validated_action_is_returned_unchanged():
+    def action(_RETURNED_VAL_):
+        return _RETURNED_VAL_
+
+    assert validate_after_returning_action(action) is action
+
+
+def test_after_returning_action_without_the_returned_value_is_rejected():
+    def action(value):
+        return value
+
+    with pytest.raises(ValueError, match="_RETURNED_VAL_"):
+        validate_after_returning_action(action)
+
+
+def test_after_returning_action_without_parameters_is_rejected():
+    def action():
+        pass
+
+    with pytest.raises(ValueError, match="no parameters"):
+        validate_after_returning_action(action)
+
+
+def test_after_returning_action_cannot_be_validated_twice():
+    @validate_after_returning_action
+    def action(_RETURNED_VAL_):
+        return _RETURNED_VAL_
+
+    with pytest.raises(ValueError, match="already decorated"):
+        validate_after_returning_action(action)
+
+
+def test_after_returning_requires_a_validated_action():
+    def action(_RETURNED_VAL_):
+        return _RETURNED_VAL_
+
+    with pytest.raises(ValueError, match="validate_after_returning_action"):
+        AfterReturning(None, action)
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda action: Before(None, action, 1, 2),
+        lambda action: Before(None, action, 1, unknown=2),
+        lambda action: Before(None, action),
+        lambda action: AfterThrowing(None, ValueError, action, 1, 2),
+        lambda action: Around(None, True, action, label=1, extra=2),
+    ],
+)
+def test_action_arguments_that_do_not_bind_are_rejected(make):
+    def action(label):
+        return label
+
+    with pytest.raises(ValueError, match="cannot be called with the action arguments"):
+        make(action)
+
+
+def test_after_returning_action_arguments_follow_the_returned_value():
+    @validate_after_returning_action
+    def action(_RETURNED_VAL_, label):
+        return label
+
+    AfterReturning(None, action, "label")
+    with pytest.raises(ValueError, match="cannot be called"):
+        AfterReturning(None, action, "label", "extra")
+
+
+def test_join_point_parameter_is_not_an_action_argument():
+    def action(label, _JOIN_POINT_):
+        return label
+
+    @Before(None, action, "label")
+    def func():
+        return "func"
+
+    assert func() == "func"
+
+
+def test_actions_without_a_signature_are_not_checked():
+    @Before(None, min, 1, 2, 3)
+    def func():
+        return "func"
+
+    assert func() == "func"
+
+
+def test_action_arguments_are_passed_as_bound():
+    calls = []
+
+    def action(*args, **kwargs):
+        calls.append((args, kwargs))
+
+    @Before(None, action, 1, 2, key="value", **{"not an identifier": 3})
+    def func():
+        return "func"
+
+    assert func() == "func"
+    assert calls == [((1, 2), {"key": "value", "not an identifier": 3})]
@@ -0,0 +1,42 @@
+from aspectpy.decorators import Before
+from aspectpy.dispatch import Dispatcher
+
+
+def test_actions_submitted_after_shutdown_are_dropped():
+    dispatcher = Dispatcher()
+    calls = []
+
+    @dispatcher.detach
+    def audit(label):
+        calls.append(label)
+
+    @Before(None, audit, "audit")
+    def func():
+        return "func"
+
+    assert func() == "func"
+    dispatcher.shutdown()
+    assert func() == "func"
+    assert calls == ["audit"]
+    assert dispatcher.dropped == 1
+    assert dispatcher.processed == 1
+
+
+def test_workers_survive_an_error_handler_that_raises(capsys):
+    def handler(exception):
+        raise RuntimeError("handler")
+
+    dispatcher = Dispatcher(error_handler=handler)
+    calls = []
+
+    def fail():
+        raise ValueError("action")
+
+    dispatcher.submit(fail)
+    dispatcher.submit(calls.append, ("after",))
+    assert dispatcher.flush(timeout=5)
+    assert calls == ["after"]
+    assert dispatcher.failed == 1
+    assert dispatcher.processed == 1
+    assert "RuntimeError: handler" in capsys.readouterr().err
+    dispatcher.shutdown()
@@ -0,0 +1,125 @@
+import pytest
+
+from aspectpy.decorators import (
+    AfterReturning,
+    AfterThrowing,
+    Before,
+    validate_after_returning_action,
+)
+from aspectpy.joinpoint import JoinPoint
+
+
+def test_join_point_exposes_the_call():
+    seen = []
+
+    def action(_JOIN_POINT_):
+        seen.append(
+            (
+                _JOIN_POINT_.target,
+                _JOIN_POINT_.args,
+                _JOIN_POINT_.kwargs,
+                dict(_JOIN_POINT_.arguments),
+            )
+        )
+
+    def func(a, b=2, *, c, d=4):
+        return a
+
+    advised = Before({"b": 20}, action)(func)
+    assert advised(1, c=3) == 1
+    assert seen == [(func, (1,), {"c": 3, "b": 20}, {"a": 1, "b": 20, "c": 3, "d": 4})]
+
+
+def test_join_point_records_the_result_and_the_exception():
+    seen = []
+
+    @validate_after_returning_action
+    def returned(_RETURNED_VAL_, _JOIN_POINT_):
+        join_point = _JOIN_POINT_
+        finished = join_point.end is not None
+        seen.append((join_point.result, join_point.exception, finished))
+        assert join_point.elapsed >= 0
+        return _RETURNED_VAL_
+
+    def raised(_JOIN_POINT_):
+        seen.append((_JOIN_POINT_.result, type(_JOIN_POINT_.exception)))
+        return "handled"
+
+    @AfterThrowing(None, ValueError, raised)
+    @AfterReturning(None, returned)
+    def func(x):
+        if x < 0:
+            raise ValueError(x)
+        return x
+
+    assert func(1) == 1
+    assert func(-1) == "handled"
+    assert seen == [(1, None, True), (None, ValueError)]
+
+
+def test_join_point_is_released_and_reused_after_the_call():
+    kept = []
+
+    def action(_JOIN_POINT_):
+        kept.append((_JOIN_POINT_, _JOIN_POINT_.copy()))
+
+    @Before(None, action)
+    def func(x):
+        return x
+
+    func(1)
+    func(2)
+    (first, first_copy), (second, second_copy) = kept
+    assert first is second
+    assert first.target is None
+    assert first.args == () and first.kwargs == {}
+    assert first.result is None and first.exception is None and first.end is None
+    assert first_copy.args == (1,) and second_copy.args == (2,)
+    assert first_copy.arguments == {"x": 1}
+
+
+def test_nested_and_reentrant_calls_get_their_own_join_points():
+    seen = []
+
+    def action(label, _JOIN_POINT_):
+        seen.append((label, _JOIN_POINT_))
+
+    @Before(None, action, "inner")
+    def inner(x):
+        return x
+
+    @Before(None, action, "outer")
+    def outer(x):
+        # The action ran right before the function with the join point of this call.
+        _, join_point = seen[-1]
+        if x:
+            # The reentrant call runs while the join point of this call is in use.
+            assert outer(x - 1) == x - 1
+        assert join_point.args == (x,)
+        return inner(x)
+
+    assert outer(1) == 1
+    labels = [label for label, _ in seen]
+    assert labels == ["outer", "outer", "inner", "inner"]
+    outer_points = [point for label, point in seen if label == "outer"]
+    assert outer_points[0] is not outer_points[1]
+    assert outer(1) == 1
+    # Both join points of the reentrant calls are back in the pool and reused.
+    assert {id(point) for label, point in seen[4:] if label == "outer"} == {
+        id(point) for point in outer_points
+    }
+
+
+def test_join_point_arguments_are_bound_only_when_accessed():
+    join_point = JoinPoint()
+    join_point._begin(lambda a, b=2: a, (1,), {})
+    assert join_point._arguments is None
+    assert join_point.arguments == {"a": 1, "b": 2}
+    assert join_point.arguments is join_point.arguments
+    pool: list[JoinPoint] = []
+    join_point._release(pool)
+    assert pool == [join_point]
+    assert join_point._arguments is None
+    with pytest.raises(TypeError):
+        # A released join point has no target to bind the arguments to.
+        join_point.arguments
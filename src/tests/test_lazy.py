@@ -0,0 +1,69 @@
+from aspectpy.decorators import Before, get_advice_chain
+from aspectpy.lazy import PENDING_JOIN_POINTS, LazyJoinPoint, lazy
+from aspectpy.pointcut import Pointcuts
+
+calls = []
+
+
+@lazy(Before({"b": 20}, calls.append, "inner"), Before(None, calls.append, "outer"))
+def lazy_module_function(a, b=2, *, c, d=4):
+    return a, b, c, d
+
+
+def test_lazy_function_is_woven_on_the_first_call_and_replaces_itself():
+    placeholder = globals()["lazy_module_function"]
+    assert isinstance(placeholder, LazyJoinPoint)
+    assert placeholder in PENDING_JOIN_POINTS
+    assert placeholder.__name__ == "lazy_module_function"
+    assert calls == []
+
+    assert lazy_module_function(1, c=3) == (1, 20, 3, 4)
+    assert calls == ["outer", "inner"]
+    woven = globals()["lazy_module_function"]
+    assert woven is not placeholder
+    assert placeholder not in PENDING_JOIN_POINTS
+    assert get_advice_chain(woven).target is placeholder.target
+    assert lazy_module_function(5, 6, c=7, d=8) == (5, 20, 7, 8)
+
+
+def test_lazy_method_binds_defaults_and_keyword_only_arguments():
+    seen = []
+    pointcuts = Pointcuts(lazy=True).add(
+        r"^handle$", Before({"d": 40}, seen.append, "advice")
+    )
+
+    @pointcuts.weave
+    class Handler:
+        def handle(self, a, b=2, *args, c, d=4, **kwargs):
+            return self, a, b, args, c, d, kwargs
+
+    assert isinstance(vars(Handler)["handle"], LazyJoinPoint)
+    assert seen == []
+
+    handler = Handler()
+    assert handler.handle(1, c=3) == (handler, 1, 2, (), 3, 40, {})
+    assert not isinstance(vars(Handler)["handle"], LazyJoinPoint)
+    assert handler.handle(1, 5, 6, c=7, d=8, e=9) == (
+        handler, 1, 5, (6,), 7, 40, {"e": 9}
+    )
+    assert seen == ["advice", "advice"]
+
+
+def test_lazy_method_is_woven_when_accessed_on_the_class():
+    seen = []
+    pointcuts = Pointcuts(lazy=True).add(
+        r"^handle$", Before(None, seen.append, "advice")
+    )
+
+    @pointcuts.weave
+    class Handler:
+        def handle(self, a, *, b=2):
+            return a, b
+
+    placeholder = vars(Handler)["handle"]
+    woven = Handler.handle
+    assert vars(Handler)["handle"] is woven
+    assert placeholder.weave() is woven
+    assert seen == []
+    assert woven(Handler(), 1, b=3) == (1, 3)
+    assert seen == ["advice"]
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+from aspectpy.decorators import Before
+from aspectpy.pointcut import Pointcuts
+
+calls = []
+pointcuts = Pointcuts(skip_super=True).add(
+    r"^(f|g|af|ag)$", Before(None, calls.append, "adv")
+)
+
+
+@pointcuts.weave
+class A:
+    def f(self, n):
+        calls.append(("A.f", n))
+
+    def g(self, n):
+        calls.append(("g", n))
+        self.f(n)
+
+    async def af(self, n):
+        calls.append(("A.af", n))
+
+    async def ag(self, n):
+        calls.append(("ag", n))
+        await self.af(n)
+
+
+@pointcuts.weave
+class B(A):
+    def f(self, n):
+        calls.append(("B.f", n))
+        super().f(n)
+        if n:
+            self.g(n - 1)
+
+    async def af(self, n):
+        calls.append(("B.af", n))
+        await super().af(n)
+        if n:
+            await self.ag(n - 1)
+
+
+def test_super_calls_skip_the_advice():
+    calls.clear()
+    B().f(0)
+    assert calls == ["adv", ("B.f", 0), ("A.f", 0)]
+
+
+def test_calls_through_another_guarded_method_are_advised():
+    calls.clear()
+    B().f(1)
+    assert calls == [
+        *("adv", ("B.f", 1), ("A.f", 1)),
+        *("adv", ("g", 0)),
+        *("adv", ("B.f", 0), ("A.f", 0)),
+    ]
+
+
+def test_coroutine_calls_through_another_guarded_method_are_advised():
+    calls.clear()
+    asyncio.run(B().af(1))
+    assert calls == [
+        *("adv", ("B.af", 1), ("A.af", 1)),
+        *("adv", ("ag", 0)),
+        *("adv", ("B.af", 0), ("A.af", 0)),
+    ]
+
+
+def test_advice_runs_once_through_a_deep_super_chain():
+    advised = []
+    pointcuts = Pointcuts(skip_super=True).add(
+        r"^handle$", Before(None, advised.append, "adv")
+    )
+
+    class Base(metaclass=pointcuts.metaclass()):
+        def handle(self):
+            return ["Base"]
+
+    class Middle(Base):
+        def handle(self):
+            return ["Middle"] + super().handle()
+
+    class Top(Middle):
+        def handle(self):
+            return ["Top"] + super().handle()
+
+    assert Top().handle() == ["Top", "Middle", "Base"]
+    assert advised == ["adv"]
+    assert Middle().handle() == ["Middle", "Base"]
+    assert advised == ["adv", "adv"]
+
+
+def test_recursive_calls_and_calls_for_other_instances_are_advised():
+    advised = []
+    pointcuts = Pointcuts(skip_super=True).add(
+        r"^handle$", Before(None, advised.append, "adv")
+    )
+
+    class Base(metaclass=pointcuts.metaclass()):
+        def handle(self, n, other=None):
+            if other is not None:
+                other.handle(0)
+            return n
+
+    class Derived(Base):
+        def handle(self, n, other=None):
+            if n:
+                return self.handle(n - 1, other)
+            return super().handle(n, other)
+
+    assert Derived().handle(1, Base()) == 0
+    # Derived.handle(1), Derived.handle(0) and the Base of the other instance.
+    assert advised == ["adv", "adv", "adv"]
+
+
+def test_super_calls_in_threads_do_not_share_a_stack():
+    advised = []
+    pointcuts = Pointcuts(skip_super=True).add(
+        r"^handle$", Before(None, advised.append, "adv")
+    )
+
+    class Base(metaclass=pointcuts.metaclass()):
+        def handle(self):
+            return "Base"
+
+    class Derived(Base):
+        def handle(self):
+            return super().handle()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(Derived().handle()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["Base"] * 8
+    assert advised == ["adv"] * 8
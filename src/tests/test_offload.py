@@ -0,0 +1,79 @@
+import pytest
+
+from aspectpy.cache import Cached
+from aspectpy.decorators import Before
+from aspectpy.offload import Offload, OffloadPool, _resolve
+
+
+@pytest.fixture
+def pool():
+    pool = OffloadPool(workers=2, processes=False)
+    yield pool
+    pool.shutdown()
+
+
+def test_map_shares_the_state_of_the_inner_advice(pool):
+    calls = []
+    offload = Offload(None, pool)
+    cached = Cached(None)
+
+    @offload
+    @cached
+    def func(x):
+        calls.append(x)
+        return x * 2
+
+    assert func(1) == 2
+    (cache,) = cached.caches.values()
+    assert list(offload.map(func, [1, 1, 2])) == [2, 2, 4]
+    assert calls == [1, 2]
+    assert cached.caches[func.__qualname__] is cache
+    assert cache.info().hits == 2
+
+
+def test_map_does_not_run_the_outer_advice(pool):
+    calls = []
+    offload = Offload({"y": 10}, pool)
+
+    @Before(None, calls.append, "outer")
+    @offload
+    @Before(None, calls.append, "inner")
+    def func(x, y=0):
+        return x + y
+
+    assert list(offload.map(func, [1, 2])) == [11, 12]
+    assert calls == ["inner", "inner"]
+
+
+def test_map_does_not_apply_the_updates_of_the_outer_advice(pool):
+    offload = Offload({"y": 10}, pool)
+
+    @Before({"z": 100}, lambda: None)
+    @offload
+    def func(x, y=0, z=0):
+        return x + y + z
+
+    assert func(1) == 111
+    assert list(offload.map(func, [1, 2])) == [11, 12]
+
+
+def test_map_tells_closures_with_the_same_qualified_name_apart(pool):
+    offload = Offload(None, pool)
+
+    def make(factor):
+        @offload
+        @Before(None, lambda: None)
+        def scale(x):
+            return x * factor
+
+        return scale
+
+    double, triple = make(2), make(3)
+    assert list(offload.map(double, [1, 2])) == [2, 4]
+    assert list(offload.map(triple, [1, 2])) == [3, 6]
+    assert double(1) == 2 and triple(1) == 3
+
+
+def test_functions_that_cannot_be_imported_are_not_offloaded():
+    with pytest.raises(RuntimeError):
+        _resolve(("aspectpy.offload", "missing_function"))
@@ -0,0 +1,37 @@
+import re
+
+from aspectpy.decorators import Before
+from aspectpy.pointcut import Pointcuts
+
+
+def test_patterns_with_backreferences_match_like_re_match():
+    getter = Before(None, print, "get")
+    setter = Before(None, print, "set")
+    pointcuts = Pointcuts().add(r"^(get)_x", getter).add(r"^(set)_\1$", setter)
+
+    assert pointcuts.match("set_set") == (setter,)
+    assert pointcuts.match("get_x") == (getter,)
+    assert pointcuts.match("set_get") == ()
+
+
+def test_patterns_with_the_same_named_group_can_be_added():
+    first = Before(None, print, "first")
+    second = Before(None, print, "second")
+    pointcuts = Pointcuts().add(r"(?P<verb>get)_", first).add(r"(?P<verb>set)_", second)
+
+    assert pointcuts.match("set_x") == (second,)
+
+
+def test_combined_and_separate_patterns_keep_the_order_of_declaration():
+    first = Before(None, print, "first")
+    second = Before(None, print, "second")
+    third = Before(None, print, "third")
+    pointcuts = (
+        Pointcuts()
+        .add(r"[a-z]+_x", first)
+        .add(re.compile("GET_", re.IGNORECASE), second)
+        .add(r"get_.", third)
+    )
+
+    assert pointcuts.match("get_x") == (first, second, third)
+    assert pointcuts.match("get_y") == (second, third)
@@ -0,0 +1,59 @@
+import threading
+
+from aspectpy.decorators import Before
+from aspectpy.profiling import Timed
+
+
+def test_histogram_is_kept_when_more_advice_is_applied():
+    timed = Timed()
+
+    @timed
+    def func():
+        pass
+
+    func()
+    func = Before(None, lambda: None)(func)
+    func()
+    (snapshot,) = timed.snapshot().values()
+    assert snapshot.count == 2
+
+
+def test_closures_with_the_same_qualified_name_are_told_apart():
+    timed = Timed()
+
+    def make():
+        @timed
+        def handle():
+            pass
+
+        return handle
+
+    first, second = make(), make()
+    for _ in range(3):
+        first()
+    second()
+    counts = sorted(snapshot.count for snapshot in timed.snapshot().values())
+    assert counts == [1, 3]
+    assert all(".make.<locals>.handle at 0x" in name for name in timed.snapshot())
+
+
+def test_arrays_of_exited_threads_are_merged_and_freed():
+    timed = Timed()
+
+    @timed
+    def func():
+        pass
+
+    for _ in range(5):
+        thread = threading.Thread(target=func)
+        thread.start()
+        thread.join()
+    func()
+
+    (histogram,) = timed.histograms.values()
+    assert len(histogram._threads) == 1
+    (snapshot,) = timed.snapshot().values()
+    assert snapshot.count == 6
+    timed.reset()
+    (snapshot,) = timed.snapshot().values()
+    assert snapshot.count == 0
@@ -0,0 +1,20 @@
+from aspectpy import registry
+from aspectpy.decorators import Before
+from aspectpy.pointcut import Pointcuts
+
+calls = []
+
+
+@Pointcuts(lazy=True).add(r"^registry_lazy_work$", Before(None, calls.append, "advice")).weave
+class Lazy:
+    def registry_lazy_work(self):
+        return "work"
+
+
+def test_lazy_join_points_can_be_disabled_before_they_are_woven():
+    assert registry.disable(r"^registry_lazy_work$") == 1
+    assert Lazy().registry_lazy_work() == "work"
+    assert calls == []
+    assert registry.enable(r"^registry_lazy_work$") == 1
+    assert Lazy().registry_lazy_work() == "work"
+    assert calls == ["advice"]
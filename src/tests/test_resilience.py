@@ -0,0 +1,41 @@
+import pytest
+
+from aspectpy.decorators import Before
+from aspectpy.resilience import CircuitBreaker, CircuitOpenError, Retry, RetryPolicy
+
+
+def test_circuit_is_kept_when_more_advice_is_applied():
+    calls = []
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    @breaker
+    def func():
+        calls.append("func")
+        raise ValueError("down")
+
+    with pytest.raises(ValueError):
+        func()
+    func = Before(None, calls.append, "before")(func)
+    with pytest.raises(CircuitOpenError):
+        func()
+    assert calls == ["func", "before"]
+    (circuit,) = breaker.circuits.values()
+    assert circuit.state == "open"
+    assert circuit.rejected == 1
+
+
+def test_retry_stats_are_kept_when_more_advice_is_applied():
+    retry = Retry(None, RetryPolicy(attempts=2, backoff=0, jitter=0))
+    attempts = []
+
+    @retry
+    def func():
+        attempts.append(None)
+        if len(attempts) % 2:
+            raise ValueError("flaky")
+
+    func()
+    func = Before(None, lambda: None)(func)
+    func()
+    (stats,) = retry.stats.values()
+    assert (stats.retries, stats.recovered) == (2, 2)
@@ -0,0 +1,93 @@
+import pytest
+
+from aspectpy.decorators import (
+    AfterReturning,
+    AfterThrowing,
+    Around,
+    Before,
+    validate_after_returning_action,
+)
+from aspectpy.sampling import EveryN
+
+
+def test_sampled_before_runs_on_the_sampled_calls():
+    calls = []
+    sampler = EveryN(2)
+
+    @sampler.sample
+    def action(name):
+        calls.append(name)
+
+    @Before(None, action, "before")
+    def func(x):
+        return x
+
+    assert [func(x) for x in range(4)] == [0, 1, 2, 3]
+    assert calls == ["before", "before"]
+    assert (sampler.sampled, sampler.skipped) == (2, 2)
+
+
+def test_sampled_after_returning_does_not_replace_the_result():
+    calls = []
+
+    @EveryN(2).sample
+    @validate_after_returning_action
+    def action(_RETURNED_VAL_):
+        calls.append(_RETURNED_VAL_)
+        return "replaced"
+
+    @AfterReturning(None, action)
+    def func(x):
+        return x
+
+    assert [func(x) for x in range(4)] == [0, 1, 2, 3]
+    assert calls == [0, 2]
+
+
+def test_sampled_after_throwing_raises_on_every_call():
+    calls = []
+
+    @EveryN(2).sample
+    def action():
+        calls.append("handled")
+        return "fallback"
+
+    @AfterThrowing(None, ValueError, action)
+    def func():
+        raise ValueError("failed")
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            func()
+    assert calls == ["handled", "handled"]
+
+
+def test_sampled_action_cannot_update_parameters():
+    @EveryN(2).sample
+    def action():
+        pass
+
+    with pytest.raises(ValueError, match="updates parameters"):
+        Before({"x": 1}, action)
+
+
+def test_sampled_action_cannot_decide_the_outcome():
+    @EveryN(2).sample
+    def action():
+        return "fallback"
+
+    with pytest.raises(ValueError, match="outcome"):
+        Around(None, False, action)
+
+
+def test_action_sampled_after_the_advice_is_created_is_checked():
+    def action():
+        pass
+
+    advice = Before({"x": 1}, action)
+    EveryN(2).sample(action)
+    with pytest.raises(ValueError, match="updates parameters"):
+
+        @advice
+        def func(x):
+            return x
@@ -0,0 +1,32 @@
+from threading import Event, Thread
+
+from aspectpy.decorators import Before
+from aspectpy.singleflight import SingleFlight
+
+
+def test_calls_in_flight_are_coalesced_after_more_advice_is_applied():
+    entered, release = Event(), Event()
+    calls = []
+    single_flight = SingleFlight()
+
+    @single_flight
+    def func(x):
+        calls.append(x)
+        entered.set()
+        release.wait()
+        return x
+
+    results = []
+    leader = Thread(target=lambda: results.append(func(1)))
+    leader.start()
+    entered.wait()
+    func = Before(None, lambda: None)(func)
+    follower = Thread(target=lambda: results.append(func(1)))
+    follower.start()
+    while not single_flight.flights[func.__qualname__].coalesced:
+        follower.join(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    assert calls == [1]
+    assert results == [1, 1]
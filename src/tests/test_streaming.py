@@ -0,0 +1,46 @@
+import asyncio
+from time import sleep
+
+from aspectpy.streaming import AfterExhausted
+
+
+def test_elapsed_time_starts_when_the_function_returns():
+    reports = []
+
+    @AfterExhausted(None, lambda _ITEM_COUNT_, _ELAPSED_: reports.append(_ELAPSED_))
+    def func():
+        yield 1
+
+    stream = func()
+    sleep(0.05)
+    assert list(stream) == [1]
+    assert reports[0] >= 0.05
+
+
+def test_elapsed_time_of_async_streams_starts_when_the_function_returns():
+    reports = []
+
+    @AfterExhausted(None, lambda _ITEM_COUNT_, _ELAPSED_: reports.append(_ELAPSED_))
+    async def func():
+        yield 1
+
+    async def consume():
+        stream = func()
+        await asyncio.sleep(0.05)
+        return [item async for item in stream]
+
+    assert asyncio.run(consume()) == [1]
+    assert reports[0] >= 0.05
+
+
+def test_action_is_not_executed_for_streams_closed_early():
+    reports = []
+
+    @AfterExhausted(None, lambda _ITEM_COUNT_, _ELAPSED_: reports.append(_ITEM_COUNT_))
+    def func():
+        yield from range(3)
+
+    for _ in func():
+        break
+    assert list(func()) == [0, 1, 2]
+    assert reports == [3]
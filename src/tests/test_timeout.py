@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aspectpy.timeout import Timeout, remaining_time
+
+
+def test_returns_the_result_within_the_deadline():
+    @Timeout(None, 1, lambda: "fallback")
+    def func(x):
+        return threading.current_thread().name, x
+
+    name, x = func(1)
+    assert name.startswith("aspectpy-timeout")
+    assert x == 1
+
+
+def test_falls_back_when_the_deadline_expires():
+    advice = Timeout(None, 0.05, lambda: "fallback")
+
+    @advice
+    def func():
+        time.sleep(0.3)
+        return "func"
+
+    assert func() == "fallback"
+    assert advice.expired == 1
+
+
+def test_exceptions_of_the_function_are_raised():
+    @Timeout(None, 1, lambda: "fallback")
+    def func():
+        raise TimeoutError("func")
+
+    with pytest.raises(TimeoutError, match="func"):
+        func()
+
+
+def test_nested_timeout_enforces_its_own_earlier_deadline():
+    @Timeout(None, 0.1, lambda: "inner fallback")
+    def inner():
+        time.sleep(0.5)
+        return "inner"
+
+    @Timeout(None, 2, lambda: "outer fallback")
+    def outer():
+        return inner()
+
+    start = time.monotonic()
+    assert outer() == "inner fallback"
+    assert time.monotonic() - start < 0.4
+
+
+def test_nested_timeout_uses_the_earlier_deadline_of_its_caller():
+    budgets = []
+
+    @Timeout(None, 2, lambda: "inner fallback")
+    def inner():
+        budgets.append(remaining_time())
+        return threading.current_thread().name
+
+    @Timeout(None, 0.5, lambda: "outer fallback")
+    def outer():
+        return threading.current_thread().name, inner()
+
+    outer_thread, inner_thread = outer()
+    # The inner call runs in the worker of the outer one, which enforces the deadline.
+    assert outer_thread == inner_thread
+    assert 0 < budgets[0] <= 0.5
+
+
+def test_calls_of_many_threads_share_the_pool():
+    @Timeout(None, 2, lambda: "fallback")
+    def func(x):
+        time.sleep(0.01)
+        return x
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda x=x: results.append(func(x))) for x in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == list(range(16))
+
+
+def test_coroutine_falls_back_and_is_cancelled():
+    cancelled = []
+
+    @Timeout(None, 0.05, lambda: "fallback")
+    async def func():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "func"
+
+    assert asyncio.run(func()) == "fallback"
+    assert cancelled == [True]
@@ -0,0 +1,61 @@
+import os
+import stat
+
+import pytest
+
+from aspectpy.tracing import Trace, TraceLog, _private_directory, read_trace
+
+
+def test_records_calls(tmp_path):
+    log = TraceLog(str(tmp_path / "trace-{pid}.bin"), capacity=4)
+
+    @Trace(log=log)
+    def func(x):
+        if x:
+            raise ValueError(x)
+
+    func(0)
+    with pytest.raises(ValueError):
+        func(1)
+    log.close()
+
+    records = read_trace(log.path)
+    assert [(record.name, record.outcome) for record in records] == [
+        (func.__qualname__, "returned"),
+        (func.__qualname__, "threw"),
+    ]
+
+
+def test_calls_recorded_after_close_are_ignored(tmp_path):
+    log = TraceLog(str(tmp_path / "trace.bin"), capacity=4)
+
+    @Trace(log=log)
+    def func():
+        return "func"
+
+    func()
+    log.close()
+    assert func() == "func"
+    assert len(read_trace(log.path)) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "O_NOFOLLOW"), reason="requires O_NOFOLLOW")
+def test_symbolic_links_are_not_followed(tmp_path):
+    victim = tmp_path / "victim"
+    victim.write_text("data")
+    (tmp_path / "trace.bin").symlink_to(victim)
+
+    with pytest.raises(OSError):
+        TraceLog(str(tmp_path / "trace.bin"), capacity=4)
+    assert victim.read_text() == "data"
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires POSIX users")
+def test_default_directory_is_private(tmp_path):
+    directory = tmp_path / "private"
+    _private_directory(str(directory))
+    assert stat.S_IMODE(directory.stat().st_mode) & 0o077 == 0
+
+    directory.chmod(0o755)
+    with pytest.raises(PermissionError):
+        _private_directory(str(directory))